@@ -0,0 +1,181 @@
+"""Uzak API yanıtları için SQLite tabanlı kalıcı önbellek.
+
+``st.cache_data`` süreç içinde kalır; sunucu yeniden başladığında tüm türler
+için API'lere yeniden gidilir. Bu modül yanıtları diskte saklar; her kaynağın
+kendi geçerlilik süresi (TTL) vardır, toplam boyut sınırı aşılınca en uzun
+süredir okunmayan kayıtlar silinir ve kaynak bazında isabet/ıska sayılır.
+"""
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+DAY = 24 * 60 * 60
+
+# Kaynak bazında geçerlilik süreleri (saniye)
+DEFAULT_TTLS = {
+    "species": 30 * DAY,
+    "gbif": 7 * DAY,
+    "inaturalist": 1 * DAY,
+    "semantic_scholar": 7 * DAY,
+}
+FALLBACK_TTL = 1 * DAY
+# Boş sonuçların (makalesi ya da gözlemi olmayan tür) geçerlilik süresi;
+# kaynak süresinden kısaysa bu kullanılır, böylece yeni eklenen kayıtlar
+# daha erken görünür
+EMPTY_TTL = 1 * DAY
+
+CACHE_PATH = os.environ.get(
+    "ISTILACI_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "api_cache.sqlite"),
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("ISTILACI_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+
+class ResponseCache:
+    """JSON'a çevrilebilen yanıtları (kaynak, anahtar) çiftiyle saklayan önbellek"""
+
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (source, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def ttl(self, source, empty=False):
+        """Kaynağın (boş sonuçlar için daha kısa olabilen) geçerlilik süresini döner"""
+        ttl = self.ttls.get(source, FALLBACK_TTL)
+        return min(ttl, EMPTY_TTL) if empty else ttl
+
+    def get(self, source, key):
+        """(bulundu_mu, değer) döner; süresi dolmuş kayıtlar ıska sayılır"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE source = ? AND key = ?",
+                (source, key),
+            ).fetchone()
+            value = json.loads(row[0]) if row is not None else None
+            if row is None or now - row[1] > self.ttl(source, empty=not value):
+                self.misses[source] += 1
+                return False, None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE source = ? AND key = ?",
+                (now, source, key),
+            )
+            self.hits[source] += 1
+        return True, value
+
+    def set(self, source, key, value):
+        """Değeri yazar ve gerekirse boyut sınırına kadar eski kayıtları siler"""
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8")) + len(key)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (source, key, payload, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """En uzun süredir okunmayan kayıtları sınırın %90'ına inene kadar siler"""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT source, key, size FROM responses ORDER BY accessed"
+        )
+        doomed = []
+        for source, key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((source, key))
+            self._total_bytes -= size
+        self._conn.executemany(
+            "DELETE FROM responses WHERE source = ? AND key = ?", doomed
+        )
+
+    def stats(self):
+        """Kaynak bazında isabet/ıska sayıları ve toplam boyutu döner"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            sources = sorted(set(self.hits) | set(self.misses))
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "sources": {
+                    s: {"hits": self.hits[s], "misses": self.misses[s]} for s in sources
+                },
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Süreç genelinde paylaşılan önbelleği (ilk kullanımda açarak) döner"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(CACHE_PATH)
+        return _default_cache
+
+
+def cached_response(source):
+    """Fonksiyon sonucunu kalıcı önbellekten okur, yoksa çağırıp yazar.
+
+    Anahtar, argümanlar imzaya varsayılanlarıyla bağlanarak kurulur;
+    ``f(5, 0)``, ``f(5, 0, None)`` ve ``f(usage_key=5)`` aynı kayda düşer.
+
+    Boş sonuçlar (None, [], {}) da yazılır ama ``EMPTY_TTL`` ile daha kısa
+    süre geçerlidir. Ağ hataları istisna olarak yükseldiğinden
+    (``HttpError``) önbelleğe yazılmaz.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = f"{func.__name__}:" + json.dumps(bound.arguments, sort_keys=True, default=str)
+            hit, value = cache.get(source, key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            cache.set(source, key, value)
+            return value
+        return wrapper
+    return decorator
@@ -1,11 +1,36 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import folium
-from streamlit_folium import st_folium
-from folium.plugins import MarkerCluster, HeatMap
-import requests
-from urllib.parse import quote
+from branca.colormap import LinearColormap
+import streamlit.components.v1 as components
+from folium.plugins import MarkerCluster, FastMarkerCluster, HeatMap
+import inspect
+import os
 import time
+from functools import partial
+from itertools import chain
+
+from api_cache import get_cache
+from map_cache import get_map_cache
+from enrichment import (
+    RENDER_BUDGET, PagedFetch, Prefetch, failed_sources, iter_ready_sections, prefetch_candidates, start_enrichment,
+)
+from http_client import HttpError
+from regions import REGIONS, ProvinceBoundaries
+from density import MAX_FEATURES, aggregate_points, grid_geojson
+from distribution import aggregate_locations, aggregate_provinces
+from gazetteer import GAZETTEER, PROVINCES, normalize_name
+from dataset import content_hash, open_dataset
+from facets import FacetIndex
+from search import SearchIndex
+from names import canonical_name, canonical_names, register as register_canonical_names
+from synonyms import SynonymIndex, register as register_synonyms
+import species_api
+from species_api import (
+    GBIF_MAX_RECORDS, GBIF_OFFSET_CAP, GBIF_PAGE_LIMIT, PRECOMPUTED_PATH,
+    create_google_scholar_link, parse_inat_locations,
+)
 
 # --- Sayfa Ayarları ---
 st.set_page_config(
@@ -95,161 +120,962 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 1. Veri Yükleme ---
-@st.cache_data
-def load_data(file):
-    """CSV veya Excel dosyasını yükler"""
+@st.cache_resource(max_entries=8)
+def load_data(digest, _uploaded_file):
+    """CSV veya Excel dosyasını yükler; (tablo, metin deposu, yer dizini) döner.
+
+    Anahtar yalnızca dosya içeriğinin özetidir: aynı listeyi yükleyen tüm
+    oturumlar sunucudaki tek bir kopyayı paylaşır (bkz. ``dataset.open_dataset``).
+    Dönen nesneler salt okunur kabul edilir; oturumlar bunları değiştirmez,
+    filtreler yalnızca satır maskesi olarak tutulur.
+    """
     try:
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
-        
-        # Boş değerleri temizle
-        df = df.fillna('')
-        
-        # Sütun isimlerini standardize et
-        df.columns = df.columns.str.strip()
+        # Kompakt tablo (Tür indeksli) ve türe göre okunan uzun metinler
+        df, texts = open_dataset(_uploaded_file.getvalue(), _uploaded_file.name, digest)
+        # API sorgularında kullanılacak kanonik adlar tek seferde çözülüp
+        # yardımcıların kullandığı eşlemeye kaydedilir
+        register_canonical_names(dict(zip(df.index, canonical_names(df.index))))
         
-        return df
+        location_index, unmatched = build_location_index(df.index, texts.column('Yerler'))
+        return df, texts, location_index, unmatched
     except Exception as e:
         st.error(f"Veri yükleme hatası: {e}")
         return None
 
+# Yan paneldeki taksonomi filtreleri: (sütun, etiket, yardım metni)
+FACET_FILTERS = (
+    ('Sistem', "Sistem", "Karasal, Sucul vb."),
+    ('Alem', "Alem (Kingdom)", None),
+    ('Şube', "Şube (Phylum)", None),
+    ('Sınıf', "Sınıf (Class)", None),
+    ('Takım', "Takım (Order)", None),
+    ('Aile', "Aile (Family)", None),
+)
+
+@st.cache_resource(max_entries=8)
+def get_facet_index(digest, _df):
+    """Veri kümesinin filtre dizinini bir kez kurar; oturumlar paylaşır"""
+    return FacetIndex(_df, [column for column, _, _ in FACET_FILTERS])
+
+# Metin aramasının kapsadığı sütunlar ve gösterilecek en fazla sonuç
+SEARCH_COLUMNS = ('Genel Adı', 'Özet', 'Tür Tanımı', 'Yaşam Alanı', 'Genel Etki Bilgisi', 'Notlar')
+SEARCH_LIMIT = 100
+
+@st.cache_resource(max_entries=8)
+def get_search_index(digest, _df, _texts):
+    """Veri kümesinin arama dizinini ilk aramada bir kez kurar; oturumlar paylaşır"""
+    fields = [_df.index.astype(str).tolist()]
+    for column in SEARCH_COLUMNS:
+        if column in _df.columns:
+            fields.append(_df[column].astype(str).tolist())
+        elif column in _texts.columns:
+            fields.append(_texts.column(column))
+    return SearchIndex(_df.index, ("\n".join(parts) for parts in zip(*fields)))
+
+@st.cache_resource(max_entries=8)
+def get_synonym_index(digest, _df):
+    """Sinonim dizinini bir kez kurar ve API yardımcıları için kaydeder"""
+    synonym_texts = _df['Sinonim'] if 'Sinonim' in _df.columns else [''] * len(_df)
+    index = SynonymIndex(_df.index, synonym_texts)
+    register_synonyms(index)
+    return index
+
+def uploaded_digest(uploaded_file):
+    """Yüklenen dosyanın içerik özetini oturum başına bir kez hesaplar"""
+    memo = st.session_state.get('_upload_digest')
+    if memo is None or memo[0] != uploaded_file.file_id:
+        memo = (uploaded_file.file_id, content_hash(uploaded_file.getvalue()))
+        st.session_state['_upload_digest'] = memo
+    return memo[1]
+
+# Bütçeyi aşan çekmeler için sayfanın yeniden çalıştırılmadan önce en çok
+# bekleyeceği süre (saniye)
+LATE_FETCH_TIMEOUT = 60
+
+# Tembel sekmeler: yalnızca açık sekmenin harita/makale işleri yapılır. Sekme
+# durumu izleme Streamlit'in yeni sürümlerinde vardır; yoksa tüm sekmeler çizilir
+LAZY_TABS = (
+    os.environ.get("ISTILACI_LAZY_TABS", "1") != "0"
+    and "on_change" in inspect.signature(st.tabs).parameters
+)
+
+LOADING_MESSAGE = "⏳ Hâlâ yükleniyor; hazır olduğunda kendiliğinden doldurulacak."
+# Kaynak adlarının uyarılarda görünen karşılıkları
+SOURCE_LABELS = {"gbif": "GBIF", "gbif_all": "GBIF", "inaturalist": "iNaturalist",
+                 "papers": "Semantic Scholar", "image": "GBIF"}
+
+def failure_message(sources):
+    """Çekilemeyen kaynaklar için kullanıcıya gösterilecek uyarı metni"""
+    labels = ", ".join(dict.fromkeys(SOURCE_LABELS.get(source, source) for source in sources))
+    return f"⚠️ {labels} şu anda yanıt vermiyor; sonraki yenilemede yeniden denenecek."
+
+def start_page_fetches(key, species_name, fetchers, scope="page"):
+    """Sayfanın (ya da parçanın) kaynaklarını başlatır; önceki çalıştırmada
+    süreyi aşıp hâlâ süren (ya da yeni biten) çekmeler yeniden başlatılmaz,
+    aynen kullanılır"""
+    late = st.session_state.pop(f'_late_fetches_{scope}', None)
+    reuse = late[1] if late is not None and late[0] == key else {}
+    futures = start_enrichment(species_name, {s: f for s, f in fetchers.items() if s not in reuse})
+    futures.update({s: reuse[s] for s in fetchers if s in reuse})
+    return futures
+
+def wait_for_late_fetches(key, late, scope="page", progress=()):
+    """Süreyi aşan çekmeler bitince sayfayı ya da yalnızca parçayı yeniden çalıştırır.
+
+    Bekleme sırasında durum satırı düzenli güncellenir ve ``progress``
+    içindeki fonksiyonlar çağrılır (ör. GBIF sayfaları geldikçe haritayı
+    yeniden çizmek için); kullanıcı bu arada başka bir seçim yaparsa
+    Streamlit çalıştırmayı burada keser.
+    """
+    st.session_state[f'_late_fetches_{scope}'] = (key, late)
+    status = st.empty()
+    give_up = time.monotonic() + LATE_FETCH_TIMEOUT
+    while time.monotonic() < give_up:
+        pending = [source for source, future in late.items() if not future.done()]
+        if not pending:
+            break
+        status.caption(f"⏳ Hâlâ yükleniyor: {', '.join(pending)}")
+        for update in progress:
+            update()
+        time.sleep(0.5)
+    status.empty()
+    if any(future.done() for future in late.values()):
+        st.rerun() if scope == "page" else st.rerun(scope="fragment")
+
+def run_section(page, section, key, species_name, fetchers, sections, render, progress=None):
+    """Bölümü, bağımlı olduğu kaynaklar geldikçe ``render(ad, sonuçlar)`` ile çizer.
+
+    ``sections`` {ad: [kaynak, ...]} biçimindedir; bir bölüm birden çok
+    aşamada (ör. ilk GBIF sayfası, ardından tüm kayıtlar) çizilebilir. Sayfa
+    çalıştırmasında bölüm yalnızca kaydedilir; tüm bölümler sayfa sonunda
+    ortak son anla, verisi önce gelen önce olmak üzere çizilir
+    (``render_page_sections``). Parça tek başına yeniden çalıştığında kendi
+    bütçesiyle kendi çekmelerini başlatır ve bekler. ``progress`` verilirse
+    geciken çekmeler beklenirken düzenli çağrılır.
+    """
+    if section in page['sections']:
+        page['sections'].discard(section)
+        page['waits'].update(sections)
+        page['renderers'].update({name: render for name in sections})
+        if progress is not None:
+            page['progress'].append(progress)
+        return
+    futures = start_page_fetches(key, species_name, fetchers, scope=section)
+    for name, results in iter_ready_sections(futures, sections, time.monotonic() + RENDER_BUDGET):
+        render(name, results)
+    late = {source: future for source, future in futures.items() if not future.done()}
+    if late:
+        wait_for_late_fetches(key, late, scope=section, progress=[progress] if progress else ())
+
+def render_page_sections(page):
+    """Kayıtlı bölümleri sayfanın son anına kadar veri geldikçe çizer; geciken
+    çekmeler ``page['late']`` içine yazılır"""
+    for name, results in iter_ready_sections(page['futures'], page['waits'], page['deadline']):
+        page['renderers'][name](name, results)
+    page['late'] = {source: future for source, future in page['futures'].items() if not future.done()}
+
+def fetch_key(species_name, fetchers, region):
+    """Çekmelerin yeniden kullanım anahtarı; tüm GBIF kayıtları çekiliyorsa üst sınır da anahtardadır"""
+    max_records = map_setting("gbif_max_records") if "gbif_all" in fetchers else None
+    return (species_name, tuple(fetchers), region, max_records)
+
+def cancel_stale_prefetch(key):
+    """Oturumun ön çekmesi başka bir seçime aitse iptal eder"""
+    current = st.session_state.get('_prefetch')
+    if current is not None and current[0] != key:
+        current[1].cancel()
+        del st.session_state['_prefetch']
+
+def start_prefetch(key, species_names, fetchers):
+    """Seçili tür çizildikten sonra olası sonraki türlerin önbelleğini ısıtır"""
+    if '_prefetch' not in st.session_state:
+        st.session_state['_prefetch'] = (key, Prefetch(species_names, fetchers))
+
+def build_location_index(species, places):
+    """Türlerin Yerler metinlerini tür/yer/enlem/boylam uzun tablosuna açar.
+
+    Satır başlarına göre bölme vektörel pandas işlemleriyle yapılır; her
+    farklı yer adı gazeteer'de yalnızca bir kez çözülür ve satırlar NumPy
+    konum dizileriyle eşlenir. Tablo türe göre sıralı indekslidir; bir türün
+    yerleri ``index.loc[tür:tür]`` ile ikili aramayla alınır. Eşleşmeyen yer
+    adları kullanım sayılarıyla ayrıca döner.
+    """
+    columns = ['Yer', 'lat', 'lon']
+    empty = pd.DataFrame(columns=columns, index=pd.Index([], name='Tür', dtype=object))
+    if not len(places):
+        return empty, pd.Series(dtype=int)
+
+    parts = pd.Series(places, dtype=object).astype(str).str.split('\n')
+    rows = np.repeat(np.arange(len(parts)), parts.str.len().to_numpy())
+    raw_codes, raw_names = pd.factorize(np.fromiter(chain.from_iterable(parts), dtype=object))
+
+    # Her farklı ham ad için gazeteer sonucu ve koordinatı
+    raw_names = pd.Series(raw_names, dtype=object).str.strip()
+    resolved = [GAZETTEER.lookup(name) for name in raw_names]
+    place_codes, places = pd.factorize(pd.Series(resolved, dtype=object))
+    matched = place_codes[raw_codes] >= 0
+
+    unmatched_counts = pd.Series(np.bincount(raw_codes[~matched], minlength=len(raw_names)), index=raw_names)
+    unmatched = unmatched_counts[(unmatched_counts > 0) & (unmatched_counts.index != '')]
+    unmatched = unmatched.groupby(level=0).sum().sort_values(ascending=False)
+    if not matched.any():
+        return empty, unmatched
+
+    # Aynı türde aynı yere düşen tekrarları at, türe göre sırala
+    rows, codes = rows[matched], place_codes[raw_codes][matched]
+    _, first = np.unique(rows * len(places) + codes, return_index=True)
+    rows, codes = rows[first], codes[first]
+    species = np.asarray(species, dtype=object)[rows]
+    order = np.argsort(species, kind='stable')
+    place_coords = np.array([GAZETTEER.coords[name] for name in places], dtype=float)
+
+    return pd.DataFrame(
+        {
+            'Yer': pd.Categorical.from_codes(codes[order], categories=places),
+            'lat': place_coords[codes[order], 0],
+            'lon': place_coords[codes[order], 1],
+        },
+        index=pd.Index(species[order], name='Tür', dtype=object),
+    ), unmatched
+
 # --- 2. API Yardımcı Fonksiyonları ---
+# Ağ çağrıları species_api modülündedir (toplu zenginleştirme işi de aynılarını
+# kullanır); burada yeniden çalıştırmalar için süreç içi önbellek eklenir
+get_gbif_occurrence_page = st.cache_data(species_api.get_gbif_occurrence_page)
+resolve_species = st.cache_data(species_api.resolve_species)
+get_inaturalist_observations = st.cache_data(species_api.get_inaturalist_observations)
+get_scientific_papers_semantic = st.cache_data(species_api.get_scientific_papers_semantic)
+
+@st.cache_resource
+def load_precomputed_enrichment(mtime):
+    """Toplu işin yan dosyasını yükler; dosya değişince (mtime) yeniden okunur"""
+    return species_api.load_precomputed(PRECOMPUTED_PATH)
+
 def get_gbif_key(species_name):
     """GBIF türü anahtar numarasını alır"""
-    clean_name = species_name.split('(')[0].split(',')[0].strip()
-    try:
-        response = requests.get(
-            f"https://api.gbif.org/v1/species/match?name={clean_name}", 
-            timeout=5
-        )
-        return response.json().get('usageKey')
-    except:
-        return None
+    return resolve_species(species_name)['usage_key']
+
+def iter_gbif_occurrences(species_name, max_records=GBIF_MAX_RECORDS, region=None):
+    """GBIF kayıtlarını offset/endOfRecords ile sayfa sayfa üreten üreteç.
 
-@st.cache_data
-def get_gbif_data(species_name, limit=200):
-    """GBIF'ten tür kayıtlarını çeker"""
+    Her adımda bir sayfanın sade kayıt listesi verilir; böylece bellekte
+    ham API yanıtları birikmez. Sayfalama ve ``max_records`` sınırı API'nin
+    döndürdüğü ham kayıt sayısına göre ilerler: bölge süzgeci bir sayfanın
+    tüm kayıtlarını atsa da sonraki sayfalara geçilir. Ağ hatası
+    ``HttpError`` olarak yükselir.
+    """
+    usage_key = get_gbif_key(species_name)
+    if not usage_key:
+        return
+    max_records = min(max_records, GBIF_OFFSET_CAP)
+    offset = 0
+    while offset < max_records:
+        page = get_gbif_occurrence_page(usage_key, offset, region)
+        records = page['records'][:max_records - offset]
+        if records:
+            yield records
+        # Eski önbellek kayıtlarında ham sayı yoktur; tam sayfa varsayılır
+        fetched = page.get('fetched', GBIF_PAGE_LIMIT)
+        if page['endOfRecords'] or not fetched:
+            return
+        offset += fetched
+
+# Süreç içi sonuç önbelleklerinin sınırı; yanıtlar ayrıca kalıcı API
+# önbelleğinde (api_cache) durduğundan bu önbellekler küçük ve kısa ömürlüdür
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_TTL = 3600
+
+# Aşağıdaki yardımcılar ağ hatasını yakalamaz: ``st.cache_data`` istisnaları
+# saklamadığından kesinti (devre kesici açıkken de) önbelleğe boş sonuç
+# olarak takılmaz; hata bölüm çizilirken uyarıya çevrilir
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, ttl=RESULT_CACHE_TTL)
+def get_gbif_data(species_name, region=None):
+    """GBIF'ten tür kayıtlarının ilk sayfasını çeker"""
     usage_key = get_gbif_key(species_name)
     if not usage_key:
         return []
-    try:
-        url = f"https://api.gbif.org/v1/occurrence/search?taxonKey={usage_key}&limit={limit}&hasCoordinate=true"
-        response = requests.get(url, timeout=10)
-        return response.json().get('results', [])
-    except:
-        return []
+    return get_gbif_occurrence_page(usage_key, 0, region)['records']
+
+# Bir GBIF sayfa işinin toplamaya ayrılan en uzun süresi (saniye)
+GBIF_FETCH_BUDGET = float(os.environ.get("ISTILACI_GBIF_FETCH_BUDGET", "20"))
+
+def gbif_pages(species_name, max_records, region=None):
+    """Oturumun GBIF sayfa işini döner; tür, üst sınır ya da bölge değişince yenisi başlar.
+
+    İş (``PagedFetch``) oturumda imleç olarak saklanır: aynı seçimde yeniden
+    çalıştırmalar ve parça yenilemeleri aynı işi ve ilerlemesini kullanır,
+    sayfalar yeniden çekilmez. Süre sınırıyla kesilmiş ya da ağ hatasıyla
+    eksik kalmış iş, sonucu gösterildikten sonraki çalıştırmada yeniden
+    başlatılır; çekilmiş sayfalar API önbelleğinden hızla geçilir.
+    """
+    key = (species_name, max_records, region)
+    current = st.session_state.get('_gbif_pages')
+    if current is not None:
+        job = current[1]
+        if current[0] == key:
+            result = job.result
+            if result is None or not job.reported or (result['complete'] and not result['truncated']):
+                return job
+        job.cancel()
+    job = PagedFetch(partial(iter_gbif_occurrences, species_name, max_records, region), GBIF_FETCH_BUDGET)
+    st.session_state['_gbif_pages'] = (key, job)
+    return job
 
-@st.cache_data
-def get_inaturalist_data(species_name, limit=200):
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, ttl=RESULT_CACHE_TTL)
+def get_inaturalist_data(species_name, limit=200, region=None):
     """iNaturalist'ten tür kayıtlarını çeker"""
-    clean_name = species_name.split('(')[0].split(',')[0].strip()
-    try:
-        # İlk olarak tür ID'sini bul
-        search_url = f"https://api.inaturalist.org/v1/taxa?q={quote(clean_name)}&rank=species"
-        search_response = requests.get(search_url, timeout=5)
-        search_data = search_response.json()
-        
-        if search_data.get('results'):
-            taxon_id = search_data['results'][0]['id']
-            
-            # Gözlem verilerini al
-            obs_url = f"https://api.inaturalist.org/v1/observations?taxon_id={taxon_id}&per_page={limit}&has[]=geo"
-            obs_response = requests.get(obs_url, timeout=10)
-            return obs_response.json().get('results', [])
-    except:
-        pass
+    taxon_id = resolve_species(species_name)['inat_taxon_id']
+    if taxon_id:
+        return get_inaturalist_observations(taxon_id, limit, region)
     return []
 
-@st.cache_data
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, ttl=RESULT_CACHE_TTL)
 def get_species_image(species_name):
     """GBIF'ten tür fotoğrafı alır"""
-    usage_key = get_gbif_key(species_name)
-    if not usage_key:
-        return None
-    try:
-        url = f"https://api.gbif.org/v1/occurrence/search?taxonKey={usage_key}&mediaType=StillImage&limit=1"
-        results = requests.get(url, timeout=5).json().get('results', [])
-        if results:
-            for media in results[0].get('media', []):
-                if media.get('type') == 'StillImage':
-                    return media.get('identifier')
-    except:
-        pass
-    return None
-
-@st.cache_data
-def get_scientific_papers_semantic(species_name, limit=10):
-    """Semantic Scholar API ile makaleleri çeker"""
-    clean_name = species_name.split('(')[0].split(',')[0].strip()
-    url = "https://api.semanticscholar.org/graph/v1/paper/search"
-    params = {
-        "query": f"{clean_name} invasive species",
-        "limit": limit,
-        "fields": "title,url,year,venue,abstract,authors,citationCount"
-    }
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        if response.status_code == 200:
-            return response.json().get('data', [])
-    except:
-        pass
-    return []
+    return resolve_species(species_name)['image_url']
+
+# --- 3. Bölüm Çizim Fonksiyonları ---
+def render_species_image(species_name, img_url):
+    """Kenar çubuğunda tür fotoğrafını gösterir"""
+    if img_url:
+        st.image(img_url, caption=species_name, use_container_width=True)
+    else:
+        st.info("📷 Fotoğraf bulunamadı")
+
+# Kümeleme katmanında her satır [enlem, boylam, etiket] dizisidir; işaretçiler
+# tarayıcıda bu fonksiyonla üretilir, Python tarafında nesne oluşturulmaz.
+OCCURRENCE_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 4, color: "%(color)s", fill: true, fillOpacity: 0.6
+    });
+    marker.bindPopup("%(source)s: " + (row[2] || "Tarih yok"));
+    marker.bindTooltip("%(tooltip)s");
+    return marker;
+};
+"""
+
+def occurrence_layer(lats, lons, labels, name, color, source, tooltip):
+    """Koordinat dizilerinden tek bir FastMarkerCluster katmanı oluşturur"""
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    valid = np.isfinite(lats) & np.isfinite(lons)
+    labels = pd.Series(labels, dtype=object)[valid]
+    rows = pd.DataFrame({
+        'lat': np.round(lats[valid], 5),
+        'lon': np.round(lons[valid], 5),
+        'label': labels.where(labels.notna(), None).to_numpy(),
+    }, dtype=object)
+    return FastMarkerCluster(
+        rows.values.tolist(),
+        callback=OCCURRENCE_MARKER_JS % {'color': color, 'source': source, 'tooltip': tooltip},
+        name=name,
+        options={'chunkedLoading': True},
+    )
+
+# Küresel katmanların gösterim biçimleri
+MAP_VIEWS = ("📌 Noktalar", "🔥 Isı haritası", "▦ Yoğunluk ızgarası")
+# Nokta gösteriminin en fazla kayıt sayısı; daha kalabalık katmanlar yoğunluk
+# ızgarasıyla çizilir (on binlerce işaretçi haritayı saniyelerce kurar ve
+# HTML'i megabaytlarca büyütür)
+MAX_POINT_RECORDS = int(os.environ.get("ISTILACI_MAX_POINT_RECORDS", "5000"))
+
+def layer_view(view, n_records):
+    """Katmanın gerçekte çizileceği gösterim; kalabalık nokta katmanı ızgaraya düşer"""
+    if view == MAP_VIEWS[0] and n_records > MAX_POINT_RECORDS:
+        return MAP_VIEWS[2]
+    return view
+
+def density_layer(lats, lons, name, color, view):
+    """Kayıtları ızgarada toplayıp ısı haritası ya da hücre katmanı olarak döner"""
+    cell_deg, cell_lats, cell_lons, counts = aggregate_points(lats, lons, MAX_FEATURES)
+    if view == MAP_VIEWS[1]:
+        # Hücre merkezleri, en kalabalık hücreye göre ağırlıklandırılır
+        weights = counts / max(counts.max(initial=0), 1)
+        data = np.column_stack([cell_lats + cell_deg / 2, cell_lons + cell_deg / 2, weights])
+        return HeatMap(data.tolist(), name=name, radius=18, blur=15)
+
+    log_max = np.log1p(counts.max(initial=0)) or 1
+    return folium.GeoJson(
+        grid_geojson(cell_deg, cell_lats, cell_lons, counts),
+        name=name,
+        style_function=lambda f: {
+            'fillColor': color,
+            'color': color,
+            'weight': 0.5,
+            'fillOpacity': 0.15 + 0.7 * np.log1p(f['properties']['count']) / log_max,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['count'], aliases=['Kayıt sayısı']),
+    )
+
+def build_species_map(species_name, local_points, show_local, gbif_results, inat_results,
+                      view=MAP_VIEWS[0]):
+    """Yerel, GBIF ve iNaturalist kayıtlarıyla dağılım haritasını kurar.
+
+    Nokta gösteriminde ``MAX_POINT_RECORDS`` üstündeki katmanlar yoğunluk
+    ızgarasıyla çizilir (bkz. ``layer_view``).
+    """
+    m = folium.Map(
+        location=[39.0, 35.0],
+        zoom_start=6,
+        tiles="CartoDB positron"
+    )
+
+    # Yerel veriler
+    if show_local and len(local_points):
+        local_layer = MarkerCluster(name="📍 Yerel Kayıtlar")
+
+        for loc, lat, lon in local_points[['Yer', 'lat', 'lon']].itertuples(index=False):
+            folium.Marker(
+                location=[lat, lon],
+                popup=f"<b>{species_name}</b><br>{loc}",
+                icon=folium.Icon(color="blue", icon="info-sign"),
+                tooltip=loc
+            ).add_to(local_layer)
+
+        local_layer.add_to(m)
+
+    # GBIF verileri
+    if gbif_results:
+        lats = np.array([rec['lat'] for rec in gbif_results], dtype=float)
+        lons = np.array([rec['lon'] for rec in gbif_results], dtype=float)
+        gbif_view = layer_view(view, len(gbif_results))
+        if gbif_view == MAP_VIEWS[0]:
+            labels = [rec.get('year') for rec in gbif_results]
+            occurrence_layer(lats, lons, labels, "🌍 GBIF", "red", "GBIF", "GBIF Kaydı").add_to(m)
+        else:
+            density_layer(lats, lons, "🌍 GBIF", "red", gbif_view).add_to(m)
+
+    # iNaturalist verileri
+    if inat_results:
+        lats, lons = parse_inat_locations(inat_results)
+        inat_view = layer_view(view, len(inat_results))
+        if inat_view == MAP_VIEWS[0]:
+            labels = [obs.get('observed_on') for obs in inat_results]
+            occurrence_layer(
+                lats, lons, labels, "🦋 iNaturalist", "green", "iNaturalist", "iNaturalist Gözlemi"
+            ).add_to(m)
+        else:
+            density_layer(lats, lons, "🦋 iNaturalist", "green", inat_view).add_to(m)
+
+    # Katman kontrolü ekle
+    folium.LayerControl().add_to(m)
+    return m
+
+# Harita kapsamı: seçili tür ya da filtrelenen tüm türlerin yerel kayıtları
+MAP_SCOPES = ("🎯 Seçili tür", "🗂️ Filtrelenen tüm türler")
+# Toplu haritada katmanlara ayırmada kullanılabilecek sütunlar
+MAP_GROUP_COLUMNS = ('Aile', 'Sınıf')
+NO_GROUPING = "Tek katman"
+# Toplu haritada katman renkleri (sırayla)
+GROUP_COLORS = (
+    "#e6194b", "#3cb44b", "#4363d8", "#f58231", "#911eb4", "#42d4f4", "#f032e6",
+    "#9a6324", "#469990", "#800000", "#808000", "#000075", "#a9a9a9",
+)
+
+@st.cache_data(max_entries=32)
+def get_location_summary(digest, filter_digest, grouping, _location_index, _species, _groups):
+    """Filtrelenen türlerin konum başına özeti; veri kümesi, filtre ve katman başına bir kez"""
+    return aggregate_locations(_location_index, _species, _groups)
+
+@st.cache_data(max_entries=32)
+def get_province_summary(digest, filter_digest, _location_index, _species):
+    """Filtrelenen türlerin il başına tür sayısı; veri kümesi ve filtre başına bir kez"""
+    return aggregate_provinces(_location_index, _species, GAZETTEER.provinces)
+
+@st.cache_resource
+def get_province_boundaries():
+    """İl sınırlarını arka planda yükleyen süreç geneli tek nesne"""
+    return ProvinceBoundaries(PROVINCES)
+
+def province_layer(provinces, boundaries):
+    """İl başına tür sayısını gösteren katmanı ve renk ölçeğini (lejant) döner.
+
+    Her il, merkezinde tür sayısıyla büyüyen ve renk ölçeğiyle boyanan bir
+    daireyle gösterilir. İl sınırları yapılandırılıp yüklendiyse bunun yerine
+    il çokgenleri aynı ölçekle boyanır.
+    """
+    counts = dict(zip(provinces['il'].tolist(), provinces['count'].tolist()))
+    names = dict(zip(provinces['il'].tolist(), provinces['names'].tolist()))
+    colormap = LinearColormap(
+        ["#ffffcc", "#fd8d3c", "#800026"], vmin=0, vmax=max(max(counts.values(), default=0), 1),
+        caption="İl başına tür sayısı",
+    )
+    name = "🗺️ İl başına tür sayısı"
+    tooltip_fields = (['il', 'count'], ['İl', 'Tür sayısı'])
+    popup_fields = (['il', 'count', 'names'], ['İl', 'Tür sayısı', 'Örnek türler'])
+    if boundaries:
+        features = [
+            {
+                "type": "Feature",
+                "geometry": geometry,
+                "properties": {"il": il, "count": counts.get(il, 0), "names": names.get(il, "")},
+            }
+            for il, geometry in boundaries.items()
+        ]
+        return folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            name=name,
+            style_function=lambda f: {
+                'fillColor': colormap(f['properties']['count']) if f['properties']['count'] else "#f0f0f0",
+                'color': "#666666",
+                'weight': 0.5,
+                'fillOpacity': 0.6,
+            },
+            tooltip=folium.GeoJsonTooltip(fields=tooltip_fields[0], aliases=tooltip_fields[1]),
+            popup=folium.GeoJsonPopup(fields=popup_fields[0], aliases=popup_fields[1]),
+        ), colormap
+
+    log_max = np.log1p(colormap.vmax)
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": GAZETTEER.coords[il][::-1]},
+            "properties": {"il": il, "count": count, "names": names[il]},
+        }
+        for il, count in counts.items()
+    ]
+    return folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        name=name,
+        marker=folium.CircleMarker(fill=True),
+        style_function=lambda f: {
+            'radius': 8 + 20 * float(np.log1p(f['properties']['count']) / log_max),
+            'color': colormap(f['properties']['count']),
+            'fillColor': colormap(f['properties']['count']),
+            'fillOpacity': 0.5,
+            'weight': 1,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=tooltip_fields[0], aliases=tooltip_fields[1]),
+        popup=folium.GeoJsonPopup(fields=popup_fields[0], aliases=popup_fields[1]),
+    ), colormap
+
+def build_filtered_map(summary, provinces=None, boundaries=None):
+    """Konum özetinden grup başına bir katmanlı toplu dağılım haritasını kurar.
+
+    Her (grup, konum) çifti tek bir daire işaretçisidir; boyutu o konumdaki
+    tür sayısıyla büyür. İşaretçi sayısı tür sayısından bağımsızdır. İl özeti
+    verilirse işaretçilerin altına il başına tür zenginliği katmanı eklenir.
+    """
+    m = folium.Map(
+        location=[39.0, 35.0],
+        zoom_start=6,
+        tiles="CartoDB positron"
+    )
+    if provinces is not None and len(provinces):
+        layer, colormap = province_layer(provinces, boundaries)
+        layer.add_to(m)
+        colormap.add_to(m)
+    log_max = np.log1p(summary['count'].max()) if len(summary) else 1.0
+    for i, (group, rows) in enumerate(summary.groupby('group', sort=False)):
+        color = GROUP_COLORS[i % len(GROUP_COLORS)]
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {"Yer": place, "count": count, "total": total, "names": names},
+            }
+            for place, lat, lon, count, total, names in zip(
+                rows['Yer'].tolist(), rows['lat'].tolist(), rows['lon'].tolist(),
+                rows['count'].tolist(), rows['total'].tolist(), rows['names'].tolist(),
+            )
+        ]
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            name=f"{group or '📍 Tüm türler'} ({len(features)} konum)",
+            marker=folium.CircleMarker(fill=True),
+            style_function=lambda f, color=color: {
+                'radius': 4 + 12 * float(np.log1p(f['properties']['count']) / log_max),
+                'color': color,
+                'fillColor': color,
+                'fillOpacity': 0.6,
+                'weight': 1,
+            },
+            tooltip=folium.GeoJsonTooltip(fields=['Yer', 'count'], aliases=['Yer', 'Tür sayısı']),
+            popup=folium.GeoJsonPopup(
+                fields=['Yer', 'count', 'total', 'names'],
+                aliases=['Yer', 'Bu katmanda tür', 'Konumdaki tüm türler', 'Örnek türler'],
+            ),
+        ).add_to(m)
+    folium.LayerControl().add_to(m)
+    return m
+
+def render_filtered_map(summary, cache_key, n_species, provinces=None):
+    """Filtrelenen türlerin toplu haritasını (önbellekten ya da kurarak) gösterir.
+
+    ``provinces`` (il özeti) verilirse il zenginliği katmanı da çizilir. Sınır
+    çokgenleri için beklenmez: hazır değilse iller daireyle çizilir ve hazır
+    olup olmadıkları önbellek anahtarına eklenir.
+    """
+    boundaries = (get_province_boundaries().get() or None) if provinces is not None else None
+    cache_key = cache_key + (provinces is not None, boundaries is not None)
+    cache = get_map_cache()
+    html = cache.get(cache_key)
+    if html is None:
+        html = build_filtered_map(summary, provinces, boundaries).get_root().render()
+        cache.set(cache_key, html)
+    if summary.empty:
+        st.info("Filtrelenen türlerin haritada gösterilebilecek yerel kaydı yok.")
+    else:
+        caption = (
+            f"{n_species} tür · {summary['Yer'].nunique()} konum · "
+            f"{summary['group'].nunique()} katman · {len(summary)} işaretçi"
+        )
+        if provinces is not None:
+            caption += f" · {len(provinces)} il"
+        st.caption(caption)
+    show_map_html(html)
+
+def show_map_html(html):
+    """Harita HTML'ini çerçeve içinde gösterir (st.iframe yoksa bileşen API'siyle)"""
+    if hasattr(st, "iframe"):
+        st.iframe(html, width=900, height=600)
+    else:
+        components.html(html, width=900, height=600)
+
+def render_species_map(species_name, local_points, show_local, gbif_results, inat_results,
+                       view=MAP_VIEWS[0], cache_key=None):
+    """Dağılım haritasını çizer.
+
+    ``cache_key`` (veri kümesi özeti, tür, yerel katman, bölge) verilirse
+    harita görünüm ve kayıt sayılarıyla birlikte bu anahtarla önbellekten
+    alınır; bulunamazsa kurulup HTML olarak saklanır.
+    """
+    key = None
+    if cache_key is not None:
+        key = cache_key + (
+            view,
+            None if gbif_results is None else len(gbif_results),
+            None if inat_results is None else len(inat_results),
+        )
+    cache = get_map_cache()
+    html = cache.get(key) if key is not None else None
+    if html is None:
+        m = build_species_map(species_name, local_points, show_local, gbif_results, inat_results, view)
+        html = m.get_root().render()
+        if key is not None:
+            cache.set(key, html)
+
+    if gbif_results:
+        st.success(f"✅ {len(gbif_results)} GBIF kaydı yüklendi")
+    if inat_results:
+        st.success(f"✅ {len(inat_results)} iNaturalist gözlemi yüklendi")
+    if any(layer_view(view, len(results or ())) != view for results in (gbif_results, inat_results)):
+        st.caption(
+            f"▦ {MAX_POINT_RECORDS} kayıttan kalabalık katmanlar noktalar yerine yoğunluk ızgarasıyla gösteriliyor."
+        )
+
+    # Harita durumu (yakınlaştırma, tıklama) kullanılmadığından durağan HTML
+    # olarak gösterilir; kaydırma ve yakınlaştırma uygulamayı yeniden çalıştırmaz
+    show_map_html(html)
+
+def render_papers(papers, google_scholar_url):
+    """Semantic Scholar makalelerini genişletilebilir kartlar olarak listeler"""
+    if papers:
+        for i, paper in enumerate(papers, 1):
+            with st.expander(
+                f"{i}. {paper.get('title', 'Başlıksız')} ({paper.get('year', 'Tarihsiz')})",
+                expanded=(i==1)
+            ):
+                # Yayın bilgileri
+                col_p1, col_p2 = st.columns([3, 1])
+
+                with col_p1:
+                    if paper.get('venue'):
+                        st.markdown(f"**📄 Yayın:** {paper['venue']}")
+
+                    if paper.get('authors'):
+                        authors = ", ".join([a.get('name', '') for a in paper['authors'][:5]])
+                        if len(paper['authors']) > 5:
+                            authors += f" ve diğerleri ({len(paper['authors'])} yazar)"
+                        st.markdown(f"**✍️ Yazarlar:** {authors}")
+
+                with col_p2:
+                    if paper.get('citationCount'):
+                        st.metric("📊 Atıf Sayısı", paper['citationCount'])
+
+                # Özet
+                if paper.get('abstract'):
+                    st.markdown("**📝 Özet:**")
+                    st.write(paper['abstract'][:500] + "..." if len(paper['abstract']) > 500 else paper['abstract'])
+
+                # Link
+                if paper.get('url'):
+                    st.markdown(f"[🔗 Makaleyi Oku]({paper['url']})")
+    else:
+        st.warning("⚠️ Semantic Scholar'da makale bulunamadı.")
+        st.info(f"💡 Daha fazla sonuç için [Google Scholar]({google_scholar_url}) üzerinden arama yapabilirsiniz.")
+
+def render_unmatched_locations(unmatched):
+    """Gazeteer'de bulunamayan yer adlarını kullanım sayılarıyla listeler"""
+    if len(unmatched) == 0:
+        return
+    with st.expander(f"⚠️ Eşleşmeyen yerler ({len(unmatched)})"):
+        st.caption("Bu adlar haritada gösterilemiyor:")
+        for name, count in unmatched.items():
+            st.caption(f"{name} ({count})")
+
+def render_cache_stats(precomputed=0):
+    """Kalıcı API önbelleğinin isabet/ıska sayılarını gösterir"""
+    stats = get_cache().stats()
+    with st.expander("⚙️ API Önbelleği"):
+        st.caption(f"{stats['entries']} kayıt · {stats['bytes'] / 1024 / 1024:.1f} MB")
+        if precomputed:
+            st.caption(f"Önceden hesaplanmış: {precomputed} tür")
+        for source, counts in stats['sources'].items():
+            st.caption(f"**{source}:** {counts['hits']} isabet / {counts['misses']} ıska")
+        maps = get_map_cache().stats()
+        st.caption(
+            f"**harita:** {maps['entries']} kayıt · {maps['bytes'] / 1024 / 1024:.1f} MB · "
+            f"{maps['hits']} isabet / {maps['misses']} ıska"
+        )
+
+def species_tabs(labels):
+    """Tür sekmelerini oluşturur; tembel kipte yalnızca açık sekme çalıştırılır"""
+    if LAZY_TABS:
+        return st.tabs(labels, key="species_tab", on_change="rerun")
+    return st.tabs(labels)
 
-def create_google_scholar_link(species_name):
-    """Google Scholar arama linki oluşturur"""
-    clean_name = species_name.split('(')[0].split(',')[0].strip()
-    query = quote(f"{clean_name} invasive species")
-    return f"https://scholar.google.com/scholar?q={query}"
-
-# --- 3. Lokasyon Koordinat Sözlüğü ---
-location_coords = {
-    "İstanbul": [41.0082, 28.9784], "Büyükada": [40.8741, 29.1293], "Haliç": [41.0289, 28.9697],
-    "Büyükçekmece Körfezi": [40.9922, 28.5671], "Marmara Denizi": [40.7500, 28.2500],
-    "Çanakkale": [40.153, 26.405], "Çanakkale Boğazı": [40.2000, 26.4000],
-    "Abide": [40.0503, 26.2192], "Kilitbahir": [40.1472, 26.3797], "Eceabat": [40.1850, 26.3575],
-    "Gelibolu": [40.4100, 26.6700], "Lapseki": [40.3444, 26.6853], "Yapıldak": [40.2078, 26.5492],
-    "Şevketiye": [40.3955, 26.8716], "Burhanlı Mevkii": [40.3069, 26.5593],
-    "Gökçeada": [40.1889, 25.9044], "Bozcaada": [39.8322, 26.0719],
-    "Balıkesir": [39.6484, 27.8826], "Bandırma": [40.3533, 27.9708], "Bandırma Körfezi": [40.3800, 27.9500],
-    "Edremit Körfezi": [39.5333, 26.8500], "Ayvalık": [39.3190, 26.6960],
-    "Bursa": [40.1885, 29.0610], "Yalova": [40.6549, 29.2842], "Hersek Lagünü": [40.7239, 29.5046],
-    "Kocaeli": [40.8533, 29.8815], "İzmit": [40.7654, 29.9408], "İzmit Körfezi": [40.7300, 29.7000],
-    "Sakarya": [40.7569, 30.3783], "Tekirdağ": [40.9780, 27.5110], "Edirne": [41.6772, 26.5557],
-    "Kırklareli": [41.7355, 27.2244], "Bilecik": [40.1419, 29.9793],
-    "İzmir": [38.4237, 27.1428], "İzmir Körfezi": [38.4500, 26.9000], "Alsancak Limanı": [38.4410, 27.1480],
-    "Levent Marina": [38.4090, 27.0850], "Aliağa": [38.7994, 26.9723],
-    "Karaburun": [38.6394, 26.5125], "Ildır": [38.3842, 26.4764], "Çeşme": [38.3232, 26.3039],
-    "Seferihisar": [38.2047, 26.8378], "Sığacık": [38.2000, 26.7800], "Urla": [38.3229, 26.7635],
-    "Dikili": [39.0717, 26.8872], "Dikili Açıkları": [39.0700, 26.8500],
-    "Muğla": [37.2154, 28.3636], "Gökova Körfezi": [36.9500, 28.1000], "Akyaka": [37.0536, 28.3264],
-    "Marmaris": [36.8550, 28.2742], "Bodrum": [37.0344, 27.4305],
-    "Fethiye": [36.6217, 29.1164], "Fethiye Körfezi": [36.6500, 29.0500],
-    "Göcek": [36.7550, 28.9380], "Dalyan": [36.8350, 28.6430],
-    "İztuzu": [36.7900, 28.6100], "Datça Yarımadası": [36.7300, 27.6800],
-    "Kuşadası": [37.8579, 27.2610], "Kuşadası Körfezi": [37.9000, 27.2000],
-    "Aydın": [37.8444, 27.8458], "Manisa": [38.6191, 27.4289], "Denizli": [37.7765, 29.0864],
-    "Antalya": [36.8969, 30.7133], "Antalya Körfezi": [36.7500, 30.8000], "Belek": [36.8622, 31.0556],
-    "Kemer": [36.5969, 30.5597], "Kaş": [36.2000, 29.6333], "Kalkan": [36.2650, 29.4130],
-    "Finike": [36.2944, 30.1464], "Alanya": [36.5437, 31.9998],
-    "Mersin": [36.8121, 34.6415], "Anamur": [36.0750, 32.8358], "Silifke": [36.3778, 33.9278],
-    "Adana": [37.0000, 35.3213], "Karataş": [36.5700, 35.3800], "Yumurtalık": [36.7720, 35.7930],
-    "Hatay": [36.2023, 36.1606], "İskenderun": [36.5867, 36.1642], "İskenderun Körfezi": [36.6660, 35.9550],
-    "Arsuz": [36.4100, 35.8800], "Samandağ": [36.0833, 35.9667],
-    "Trabzon": [41.0027, 39.7168], "Rize": [41.0201, 40.5234], "Artvin": [41.1828, 41.8183],
-    "Giresun": [40.9128, 38.3895], "Ordu": [40.9839, 37.8764], "Samsun": [41.2867, 36.3300],
-    "Sinop": [42.0231, 35.1531], "Zonguldak": [41.4564, 31.7936], "Bartın": [41.6344, 32.3375],
-    "Kastamonu": [41.3887, 33.7827], "Bolu": [40.7350, 31.6061], "Düzce": [40.8438, 31.1565],
-    "Ankara": [39.9334, 32.8597], "Eskişehir": [39.7667, 30.5256], "Konya": [37.8667, 32.4800],
-    "Kayseri": [38.7312, 35.4787], "Sivas": [39.7477, 37.0163],
-    "Erzurum": [39.9043, 41.2691], "Van": [38.4891, 43.4089], "Elazığ": [38.6810, 39.2264],
-    "Malatya": [38.3552, 38.3095], "Diyarbakır": [37.9144, 40.2306], "Şanlıurfa": [37.1591, 38.7969],
-    "Gaziantep": [37.0662, 37.3833], "Iğdır": [39.9237, 44.0450]
+def tab_is_open(tab):
+    """Sekme açıksa (tembel kip kapalıyken her zaman) True döner"""
+    return not LAZY_TABS or bool(tab.open)
+
+GBIF_RECORD_OPTIONS = [GBIF_PAGE_LIMIT, 1000, 3000, 10000, 30000, GBIF_OFFSET_CAP]
+
+# Harita ayarlarının varsayılanları. Harita sekmesi kapalıyken (ya da bir
+# seçenek gizliyken) widget'lar çizilmez ve Streamlit değerlerini siler;
+# değerler bu yüzden ayrıca widget olmayan anahtarlarda saklanır
+MAP_SETTINGS = {
+    "map_scope": MAP_SCOPES[0],
+    "show_local": True,
+    "show_gbif": False,
+    "show_inaturalist": False,
+    "region_only": False,
+    "map_grouping": None,
+    "map_provinces": True,
+    "map_view": MAP_VIEWS[0],
+    "gbif_max_records": GBIF_MAX_RECORDS,
 }
 
+def keep_setting(key):
+    """Widget değerini widget silinince de kalan anahtara yazar"""
+    st.session_state[f"_kept_{key}"] = st.session_state[key]
+
+def map_setting(key):
+    """Harita ayarının güncel değeri (widget çizilmemiş olsa da)"""
+    if key in st.session_state:
+        return st.session_state[key]
+    return st.session_state.get(f"_kept_{key}", MAP_SETTINGS[key])
+
+def kept_widget(key, options=None):
+    """Widget'ı saklanan değerle başlatır; widget'a verilecek argümanları döner"""
+    if key not in st.session_state:
+        value = st.session_state.get(f"_kept_{key}", MAP_SETTINGS[key])
+        if options is None or value in options:
+            st.session_state[key] = value
+    return {"key": key, "on_change": keep_setting, "args": (key,)}
+
+def layer_fetchers(species_name):
+    """Açık harita katmanlarının çekme fonksiyonlarını ve bölge seçimini döner.
+
+    Tüm filtrelenen türlerin haritasında yalnızca yerel kayıtlar kullanılır.
+    """
+    region = "turkey" if map_setting("region_only") else None
+    fetchers = {}
+    if map_setting("map_scope") != MAP_SCOPES[0]:
+        return fetchers, region
+    if map_setting("show_gbif"):
+        fetchers["gbif"] = partial(get_gbif_data, region=region)
+        # İlk sayfanın ötesindeki kayıtlar arka planda toplanır
+        max_records = map_setting("gbif_max_records")
+        if max_records > GBIF_PAGE_LIMIT:
+            fetchers["gbif_all"] = gbif_pages(species_name, max_records, region).run
+    if map_setting("show_inaturalist"):
+        fetchers["inaturalist"] = partial(get_inaturalist_data, region=region)
+    return fetchers, region
+
+@st.fragment
+def map_section(species_name, local_points, page, data_digest, location_index,
+                filtered_species, group_columns, filter_digest):
+    """Coğrafi dağılım sekmesi; katman seçimleri yalnızca bu bölümü yeniden çalıştırır"""
+    all_species = map_setting("map_scope") != MAP_SCOPES[0]
+    if all_species:
+        st.subheader(f"🗺️ Filtrelenen {len(filtered_species)} tür - Coğrafi Dağılım")
+    else:
+        st.subheader(f"🗺️ {species_name} - Coğrafi Dağılım")
+    
+    fetchers, region = layer_fetchers(species_name)
+    show_gbif = "gbif" in fetchers
+    show_inaturalist = "inaturalist" in fetchers
+    col_map1, col_map2 = st.columns([3, 1])
+    
+    with col_map2:
+        st.radio(
+            "Harita kapsamı", MAP_SCOPES, **kept_widget("map_scope", MAP_SCOPES),
+            help="Filtrelenen tüm türlerin yerel kayıtları konum başına toplanarak gösterilir"
+        )
+        st.markdown("#### Veri Kaynakları")
+        # Toplu haritada uzak kaynaklar kullanılmaz; seçimler korunsun diye
+        # kutucuklar gizlenmez, devre dışı bırakılır
+        show_local = st.checkbox("📍 Yerel Kayıtlar", disabled=all_species, **kept_widget("show_local"))
+        st.checkbox("🌍 GBIF Verileri", disabled=all_species, **kept_widget("show_gbif"))
+        st.checkbox("🦋 iNaturalist Verileri", disabled=all_species, **kept_widget("show_inaturalist"))
+        st.checkbox(
+            REGIONS["turkey"]["label"], disabled=all_species, **kept_widget("region_only"),
+            help="GBIF ve iNaturalist kayıtlarını sunucu tarafında Türkiye ile sınırlar"
+        )
+        
+        if all_species:
+            grouping_options = [*group_columns, NO_GROUPING]
+            grouping = st.radio(
+                "Katmanlar", grouping_options, **kept_widget("map_grouping", grouping_options),
+                help="Her aile/sınıf ayrı katmandır; en kalabalık gruplar dışındakiler \"Diğer\" katmanında toplanır"
+            )
+            show_provinces = st.checkbox(
+                "🗺️ İl başına tür sayısı", **kept_widget("map_provinces"),
+                help="Alt yerler (ilçe, körfez, ada) bağlı oldukları ile sayılır; her tür bir ilde bir kez sayılır"
+            )
+        
+        if show_gbif or show_inaturalist:
+            map_view = st.radio(
+                "Küresel kayıt gösterimi", MAP_VIEWS, **kept_widget("map_view", MAP_VIEWS),
+                help="Çok kayıtlı türlerde ısı haritası ve ızgara, kayıtları hücrelerde toplar"
+            )
+        else:
+            map_view = MAP_VIEWS[0]
+        
+        if show_gbif:
+            gbif_max_records = st.select_slider(
+                "En fazla GBIF kaydı",
+                options=GBIF_RECORD_OPTIONS,
+                **kept_widget("gbif_max_records", GBIF_RECORD_OPTIONS)
+            )
+        
+        if show_gbif or show_inaturalist:
+            st.info("Küresel veriler yükleniyor... Bu işlem birkaç saniye sürebilir.")
+    
+    with col_map1:
+        if all_species:
+            groups = group_columns.get(grouping)
+            summary = get_location_summary(data_digest, filter_digest, grouping, location_index, filtered_species, groups)
+            provinces = (
+                get_province_summary(data_digest, filter_digest, location_index, filtered_species)
+                if show_provinces else None
+            )
+            render_filtered_map(summary, (data_digest, filter_digest, grouping), len(filtered_species), provinces)
+            return
+        map_slot = st.empty()
+        map_slot.info("🗺️ Harita hazırlanıyor...")
+    
+    key = fetch_key(species_name, fetchers, region)
+    # Çizilmiş harita HTML'i veri kümesi, tür ve katman seçimine göre önbellekte
+    map_key = (data_digest, species_name, show_local, region)
+    # Harita önce ilk GBIF sayfasıyla çizilir; kalan sayfalar geldikçe kayıt
+    # sayısı her iki katına çıktığında, tüm kayıtlar gelince de yeniden çizilir
+    sections = {"map": [source for source in fetchers if source != "gbif_all"]}
+    pages = None
+    if "gbif_all" in fetchers:
+        sections["map_all"] = [source for source in fetchers if source != "gbif"]
+        pages = gbif_pages(species_name, map_setting("gbif_max_records"), region)
+    drawn = set()
+    shown = {}
+
+    def render(name, results):
+        failed = failed_sources(results)
+        results = {source: value for source, value in results.items() if source not in failed}
+        full = results.get("gbif_all")
+        if name == "map_all":
+            if full is None:
+                return
+            gbif_results = full['records']
+        elif "map_all" in drawn:
+            return
+        else:
+            gbif_results = results.get("gbif")
+        drawn.add(name)
+        shown.update(count=len(gbif_results or ()), inaturalist=results.get("inaturalist"))
+        if name == "map_all":
+            pages.reported = True
+        with map_slot.container():
+            render_species_map(
+                species_name, local_points, show_local,
+                gbif_results, results.get("inaturalist"), map_view, map_key
+            )
+            if failed:
+                st.warning(failure_message(failed))
+            if full is not None and not full['complete']:
+                st.warning("⚠️ GBIF kayıtlarının bir kısmı alınamadı; alınabilenler gösteriliyor.")
+            elif full is not None and full['truncated']:
+                st.info(
+                    f"⏳ Süre sınırı nedeniyle ilk {len(full['records'])} GBIF kaydı gösteriliyor; "
+                    "kalan sayfalar sonraki yenilemede yüklenir."
+                )
+            if any(source not in results and source not in failed for source in sections[name]):
+                st.info(LOADING_MESSAGE)
+            elif name == "map" and "map_all" in sections:
+                st.caption(f"🌍 Kalan GBIF kayıtları (en fazla {gbif_max_records}) arka planda yükleniyor...")
+
+    def progress():
+        # Toplam çizim maliyeti kayıt sayısıyla doğrusal kalsın diye harita
+        # ancak kayıt sayısı iki katına çıkınca yeniden çizilir
+        if pages is None or pages.done or "map" not in drawn or "map_all" in drawn:
+            return
+        count = pages.count
+        if count < 2 * max(shown['count'], 1):
+            return
+        shown['count'] = count
+        with map_slot.container():
+            render_species_map(
+                species_name, local_points, show_local,
+                pages.snapshot(), shown['inaturalist'], map_view
+            )
+            st.caption(f"🌍 GBIF kayıtları alınıyor... {count} / en fazla {map_setting('gbif_max_records')}")
+
+    run_section(page, "map", key, species_name, fetchers, sections, render, progress)
+
+@st.fragment
+def papers_section(species_name, page):
+    """Akademik yayınlar sekmesi; geciken makaleler yalnızca bu bölümü yeniler"""
+    st.subheader(f"📚 {species_name} - Akademik Yayınlar")
+    
+    # Google Scholar Linki
+    google_scholar_url = create_google_scholar_link(species_name)
+    st.markdown(f"""
+        <a href='{google_scholar_url}' target='_blank' 
+           style='display: inline-block; padding: 0.5rem 1.5rem; 
+                  background: linear-gradient(135deg, #4285f4 0%, #34a853 100%);
+                  color: white; text-decoration: none; border-radius: 5px; 
+                  font-weight: 600; margin-bottom: 1rem;'>
+            🔍 Google Scholar'da Ara
+        </a>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Semantic Scholar Makaleleri
+    st.markdown("### 📖 Semantic Scholar Makaleleri")
+    
+    papers_slot = st.empty()
+    papers_slot.info("Makaleler aranıyor...")
+    
+    fetchers = {"papers": get_scientific_papers_semantic}
+
+    def render(name, results):
+        if failed_sources(results):
+            with papers_slot.container():
+                st.warning(failure_message(["papers"]))
+                st.info(f"💡 [Google Scholar]({google_scholar_url}) üzerinden arama yapabilirsiniz.")
+        elif "papers" in results:
+            with papers_slot.container():
+                render_papers(results["papers"], google_scholar_url)
+        else:
+            papers_slot.info(LOADING_MESSAGE)
+
+    run_section(page, "papers", (species_name,), species_name, fetchers, {"papers": ["papers"]}, render)
+
 # --- ANA UYGULAMA ---
 def main():
+    render_started = time.monotonic()
     # Başlık
     st.markdown("""
         <div class='main-header'>
@@ -257,6 +1083,10 @@ def main():
             <p>Türkiye'deki İstilacı Türlerin Detaylı Bilgi ve Coğrafi Dağılım Platformu</p>
         </div>
     """, unsafe_allow_html=True)
+
+    # Toplu işin ürettiği zenginleştirme dosyası varsa API'den önce o kullanılır
+    precomputed_mtime = os.path.getmtime(PRECOMPUTED_PATH) if os.path.exists(PRECOMPUTED_PATH) else 0
+    precomputed_count = load_precomputed_enrichment(precomputed_mtime)
     
     # Yan Panel - Dosya Yükleme
     with st.sidebar:
@@ -280,9 +1110,11 @@ def main():
         return
     
     # Veriyi yükle
-    df = load_data(uploaded_file)
-    if df is None:
+    data_digest = uploaded_digest(uploaded_file)
+    data = load_data(data_digest, uploaded_file)
+    if data is None:
         return
+    df, texts, location_index, unmatched_locations = data
     
     # --- İSTATİSTİKLER ---
     col1, col2, col3, col4 = st.columns(4)
@@ -325,101 +1157,75 @@ def main():
     st.markdown("---")
     
     # --- YAN PANEL FİLTRELEME ---
+    # Seçimler widget'lardan önce okunur; her filtrenin seçenekleri ve
+    # sayıları diğer filtrelere göre daralır
+    facets = get_facet_index(data_digest, df)
+    selections = {column: st.session_state.get(f"facet_{column}", []) for column in facets.columns}
+    option_counts = facets.counts(selections)
+    
     with st.sidebar:
         st.header("🔍 Filtreleme Seçenekleri")
         
-        # Sistem Filtresi
-        if 'Sistem' in df.columns:
-            sistem_options = sorted([s for s in df['Sistem'].unique() if s])
-            selected_sistem = st.multiselect(
-                "Sistem",
-                sistem_options,
-                default=sistem_options,
-                help="Karasal, Sucul vb."
-            )
-        else:
-            selected_sistem = []
-        
-        # Alem Filtresi
-        if 'Alem' in df.columns:
-            alem_options = sorted([a for a in df['Alem'].unique() if a])
-            selected_alem = st.multiselect(
-                "Alem (Kingdom)",
-                alem_options,
-                default=alem_options
-            )
-        else:
-            selected_alem = []
-        
-        # Şube Filtresi
-        if 'Şube' in df.columns:
-            sube_options = sorted([s for s in df['Şube'].unique() if s])
-            selected_sube = st.multiselect(
-                "Şube (Phylum)",
-                sube_options,
-                default=sube_options
-            )
-        else:
-            selected_sube = []
-        
-        # Sınıf Filtresi
-        if 'Sınıf' in df.columns:
-            sinif_options = sorted([s for s in df['Sınıf'].unique() if s])
-            selected_sinif = st.multiselect(
-                "Sınıf (Class)",
-                sinif_options,
-                default=sinif_options
-            )
-        else:
-            selected_sinif = []
-        
-        # Takım Filtresi
-        if 'Takım' in df.columns:
-            takim_options = sorted([t for t in df['Takım'].unique() if t])
-            selected_takim = st.multiselect(
-                "Takım (Order)",
-                takim_options,
-                default=takim_options
-            )
-        else:
-            selected_takim = []
-        
-        # Aile Filtresi
-        if 'Aile' in df.columns:
-            aile_options = sorted([a for a in df['Aile'].unique() if a])
-            selected_aile = st.multiselect(
-                "Aile (Family)",
-                aile_options,
-                default=aile_options
+        for column, label, help_text in FACET_FILTERS:
+            if column not in facets.columns:
+                continue
+            counts = dict(zip(facets.values[column], option_counts[column].tolist()))
+            selected = selections[column]
+            options = [v for v in facets.values[column] if v and (counts[v] or v in selected)]
+            st.multiselect(
+                label,
+                options,
+                key=f"facet_{column}",
+                format_func=lambda v, counts=counts: f"{v} ({counts.get(v, 0)})",
+                placeholder="Tümü",
+                help=help_text
             )
-        else:
-            selected_aile = []
     
-    # Filtreleme uygula
-    filtered_df = df.copy()
-    if 'Sistem' in df.columns and selected_sistem:
-        filtered_df = filtered_df[filtered_df['Sistem'].isin(selected_sistem)]
-    if 'Alem' in df.columns and selected_alem:
-        filtered_df = filtered_df[filtered_df['Alem'].isin(selected_alem)]
-    if 'Şube' in df.columns and selected_sube:
-        filtered_df = filtered_df[filtered_df['Şube'].isin(selected_sube)]
-    if 'Sınıf' in df.columns and selected_sinif:
-        filtered_df = filtered_df[filtered_df['Sınıf'].isin(selected_sinif)]
-    if 'Takım' in df.columns and selected_takim:
-        filtered_df = filtered_df[filtered_df['Takım'].isin(selected_takim)]
-    if 'Aile' in df.columns and selected_aile:
-        filtered_df = filtered_df[filtered_df['Aile'].isin(selected_aile)]
+    # Sinonim dizini hem ad aramasında hem API eşleştirmesinde kullanılır
+    synonym_index = get_synonym_index(data_digest, df)
+    
+    # Filtreleme uygula: paylaşılan tablo kopyalanmaz, bit eşlemleri VE'lenir
+    row_mask = facets.rows(selections)
+    filtered_species = df.index[row_mask]
     
     # Tür Seçimi
     with st.sidebar:
         st.markdown("---")
         st.header("🎯 Tür Seçimi")
         
-        if len(filtered_df) == 0:
+        if len(filtered_species) == 0:
             st.warning("Seçili filtrelere uygun tür bulunamadı!")
             return
         
-        species_list = sorted(filtered_df['Tür'].unique())
+        # Metin araması: sonuçlar filtrelere uyan türlerle sınırlı, puana göre sıralı
+        query = st.text_input(
+            "🔎 Metinlerde ara",
+            key="search_query",
+            placeholder="ör. kıyı, tarım zararlısı, balast suyu",
+            help="Tür adı, genel ad, özet, tanım, yaşam alanı, etki ve notlarda arar"
+        )
+        if query.strip():
+            # Önce adı (kabul edilen ya da sinonim) sorguyla başlayan türler,
+            # ardından metin araması sonuçları
+            name_hits = synonym_index.search(query)
+            if name_hits:
+                allowed = set(filtered_species)
+                name_hits = [(name, label) for name, label in name_hits if name in allowed]
+            results = get_search_index(data_digest, df, texts).search(
+                query, limit=SEARCH_LIMIT, mask=row_mask
+            )
+            species_list = list(dict.fromkeys(
+                [name for name, _ in name_hits] + [name for name, _ in results]
+            ))
+            if not species_list:
+                st.warning("Aramaya uygun tür bulunamadı!")
+                return
+            st.caption(f"{len(species_list)} sonuç, en uygun olan başta")
+            for name, label in name_hits:
+                if normalize_name(label) != normalize_name(canonical_name(name)):
+                    st.caption(f"↪ *{label}*: **{name}** türünün sinonimi")
+        else:
+            species_list = sorted(filtered_species.unique())
         target_species = st.selectbox(
             f"Tür seçin ({len(species_list)} tür)",
             species_list,
@@ -428,19 +1234,53 @@ def main():
     
     # Seçili türün verilerini al
     if target_species:
-        species_row = filtered_df[filtered_df['Tür'] == target_species].iloc[0]
+        species_row = {
+            'Tür': target_species,
+            **df.loc[[target_species]].iloc[0].to_dict(),
+            **texts.get(target_species),
+        }
+        species_locations = location_index.loc[target_species:target_species]
+        
+        # Ana İçerik Sekmeleri (yan panelden önce oluşturulur ki açık sekme
+        # belli olsun; yerleşim değişmez)
+        tab_map, tab_details, tab_papers, tab_taxonomy = species_tabs([
+            "🗺️ Coğrafi Dağılım",
+            "📋 Tür Bilgileri",
+            "📚 Akademik Yayınlar",
+            "🧬 Taksonomik Detaylar"
+        ])
+        map_open, papers_open = tab_is_open(tab_map), tab_is_open(tab_papers)
+        used_tabs = st.session_state.setdefault('_used_tabs', set())
+        used_tabs.update(name for name, is_open in (("map", map_open), ("papers", papers_open)) if is_open)
+        
+        # Uzak kaynakları aynı anda başlat; yalnızca açık sekmelerin kaynakları
+        # (harita katmanları da yalnızca açıksa) çekilir
+        layers, region = layer_fetchers(target_species)
+        fetchers = {"image": get_species_image}
+        if papers_open:
+            fetchers["papers"] = get_scientific_papers_semantic
+        if map_open:
+            fetchers.update(layers)
+        page_key = fetch_key(target_species, fetchers, region)
+        # Ön çekme oturumda açılmış sekmelerin kaynaklarını ısıtır
+        prefetch_fetchers = {"image": get_species_image}
+        if "papers" in used_tabs:
+            prefetch_fetchers["papers"] = get_scientific_papers_semantic
+        if "map" in used_tabs:
+            # Tüm GBIF sayfaları ön çekmeye alınmaz; yalnızca ilk sayfa ısıtılır
+            prefetch_fetchers.update({source: fetch for source, fetch in layers.items() if source != "gbif_all"})
+        # Seçim ya da açık katmanlar değiştiyse eski ön çekmeler yeni türle yarışmasın
+        prefetch_key = (target_species, tuple(prefetch_fetchers), region)
+        cancel_stale_prefetch(prefetch_key)
+        futures = start_page_fetches(page_key, target_species, fetchers)
         
         # Sol panelde tür özeti
         with st.sidebar:
             st.markdown("---")
             
-            # Fotoğraf
-            with st.spinner("Fotoğraf yükleniyor..."):
-                img_url = get_species_image(target_species)
-                if img_url:
-                    st.image(img_url, caption=target_species, use_container_width=True)
-                else:
-                    st.info("📷 Fotoğraf bulunamadı")
+            # Fotoğraf (veri geldiğinde doldurulur)
+            image_slot = st.empty()
+            image_slot.info("📷 Fotoğraf yükleniyor...")
             
             # Taksonomik Hiyerarşi
             st.markdown("### 🧬 Taksonomik Hiyerarşi")
@@ -456,107 +1296,8 @@ def main():
                 if col in species_row and species_row[col]:
                     st.markdown(f"**{label}:** <span style='color: #1a202c;'>{species_row[col]}</span>", unsafe_allow_html=True)
         
-        # Ana İçerik Sekmeleri
-        tab_map, tab_details, tab_papers, tab_taxonomy = st.tabs([
-            "🗺️ Coğrafi Dağılım",
-            "📋 Tür Bilgileri",
-            "📚 Akademik Yayınlar",
-            "🧬 Taksonomik Detaylar"
-        ])
-        
-        # --- SEKME 1: COĞRAFİ DAĞILIM ---
-        with tab_map:
-            st.subheader(f"🗺️ {target_species} - Coğrafi Dağılım")
-            
-            col_map1, col_map2 = st.columns([3, 1])
-            
-            with col_map2:
-                st.markdown("#### Veri Kaynakları")
-                show_local = st.checkbox("📍 Yerel Kayıtlar", value=True)
-                show_gbif = st.checkbox("🌍 GBIF Verileri", value=False)
-                show_inaturalist = st.checkbox("🦋 iNaturalist Verileri", value=False)
-                
-                if show_gbif or show_inaturalist:
-                    st.info("Küresel veriler yükleniyor... Bu işlem birkaç saniye sürebilir.")
-            
-            with col_map1:
-                # Harita oluştur
-                m = folium.Map(
-                    location=[39.0, 35.0],
-                    zoom_start=6,
-                    tiles="CartoDB positron"
-                )
-                
-                # Yerel veriler
-                if show_local and 'Yerler' in species_row:
-                    local_layer = MarkerCluster(name="📍 Yerel Kayıtlar")
-                    
-                    locations = str(species_row['Yerler']).split('\n')
-                    for loc in locations:
-                        loc = loc.strip()
-                        if loc and loc in location_coords:
-                            coords = location_coords[loc]
-                            folium.Marker(
-                                location=coords,
-                                popup=f"<b>{target_species}</b><br>{loc}",
-                                icon=folium.Icon(color="blue", icon="info-sign"),
-                                tooltip=loc
-                            ).add_to(local_layer)
-                    
-                    local_layer.add_to(m)
-                
-                # GBIF verileri
-                if show_gbif:
-                    with st.spinner("GBIF verileri yükleniyor..."):
-                        gbif_results = get_gbif_data(target_species)
-                        if gbif_results:
-                            gbif_layer = folium.FeatureGroup(name="🌍 GBIF")
-                            for rec in gbif_results:
-                                if 'decimalLatitude' in rec and 'decimalLongitude' in rec:
-                                    folium.CircleMarker(
-                                        location=[rec['decimalLatitude'], rec['decimalLongitude']],
-                                        radius=4,
-                                        color="red",
-                                        fill=True,
-                                        fill_opacity=0.6,
-                                        popup=f"GBIF: {rec.get('year', 'Tarih yok')}",
-                                        tooltip="GBIF Kaydı"
-                                    ).add_to(gbif_layer)
-                            gbif_layer.add_to(m)
-                            st.success(f"✅ {len(gbif_results)} GBIF kaydı yüklendi")
-                
-                # iNaturalist verileri
-                if show_inaturalist:
-                    with st.spinner("iNaturalist verileri yükleniyor..."):
-                        inat_results = get_inaturalist_data(target_species)
-                        if inat_results:
-                            inat_layer = folium.FeatureGroup(name="🦋 iNaturalist")
-                            for obs in inat_results:
-                                if obs.get('location'):
-                                    coords = obs['location'].split(',')
-                                    if len(coords) == 2:
-                                        try:
-                                            lat, lon = float(coords[0]), float(coords[1])
-                                            folium.CircleMarker(
-                                                location=[lat, lon],
-                                                radius=4,
-                                                color="green",
-                                                fill=True,
-                                                fill_opacity=0.6,
-                                                popup=f"iNaturalist: {obs.get('observed_on', 'Tarih yok')}",
-                                                tooltip="iNaturalist Gözlemi"
-                                            ).add_to(inat_layer)
-                                        except:
-                                            pass
-                            inat_layer.add_to(m)
-                            st.success(f"✅ {len(inat_results)} iNaturalist gözlemi yüklendi")
-                
-                # Katman kontrolü ekle
-                folium.LayerControl().add_to(m)
-                
-                # Haritayı göster
-                st_folium(m, width=900, height=600)
-        
+        # Yerel verilerle çizilen sekmeler önce gelir; uzak verileri bekleyen
+        # sekmeler bütçe içinde ardından doldurulur
         # --- SEKME 2: TÜR BİLGİLERİ ---
         with tab_details:
             st.subheader(f"📋 {target_species} - Detaylı Bilgiler")
@@ -615,65 +1356,6 @@ def main():
                 st.markdown("#### 📝 Notlar")
                 st.info(species_row['Notlar'])
         
-        # --- SEKME 3: AKADEMİK YAYINLAR ---
-        with tab_papers:
-            st.subheader(f"📚 {target_species} - Akademik Yayınlar")
-            
-            # Google Scholar Linki
-            google_scholar_url = create_google_scholar_link(target_species)
-            st.markdown(f"""
-                <a href='{google_scholar_url}' target='_blank' 
-                   style='display: inline-block; padding: 0.5rem 1.5rem; 
-                          background: linear-gradient(135deg, #4285f4 0%, #34a853 100%);
-                          color: white; text-decoration: none; border-radius: 5px; 
-                          font-weight: 600; margin-bottom: 1rem;'>
-                    🔍 Google Scholar'da Ara
-                </a>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("---")
-            
-            # Semantic Scholar Makaleleri
-            st.markdown("### 📖 Semantic Scholar Makaleleri")
-            
-            with st.spinner("Makaleler aranıyor..."):
-                papers = get_scientific_papers_semantic(target_species)
-                
-                if papers:
-                    for i, paper in enumerate(papers, 1):
-                        with st.expander(
-                            f"{i}. {paper.get('title', 'Başlıksız')} ({paper.get('year', 'Tarihsiz')})",
-                            expanded=(i==1)
-                        ):
-                            # Yayın bilgileri
-                            col_p1, col_p2 = st.columns([3, 1])
-                            
-                            with col_p1:
-                                if paper.get('venue'):
-                                    st.markdown(f"**📄 Yayın:** {paper['venue']}")
-                                
-                                if paper.get('authors'):
-                                    authors = ", ".join([a.get('name', '') for a in paper['authors'][:5]])
-                                    if len(paper['authors']) > 5:
-                                        authors += f" ve diğerleri ({len(paper['authors'])} yazar)"
-                                    st.markdown(f"**✍️ Yazarlar:** {authors}")
-                            
-                            with col_p2:
-                                if paper.get('citationCount'):
-                                    st.metric("📊 Atıf Sayısı", paper['citationCount'])
-                            
-                            # Özet
-                            if paper.get('abstract'):
-                                st.markdown("**📝 Özet:**")
-                                st.write(paper['abstract'][:500] + "..." if len(paper['abstract']) > 500 else paper['abstract'])
-                            
-                            # Link
-                            if paper.get('url'):
-                                st.markdown(f"[🔗 Makaleyi Oku]({paper['url']})")
-                else:
-                    st.warning("⚠️ Semantic Scholar'da makale bulunamadı.")
-                    st.info(f"💡 Daha fazla sonuç için [Google Scholar]({google_scholar_url}) üzerinden arama yapabilirsiniz.")
-        
         # --- SEKME 4: TAKSONOMİK DETAYLAR ---
         with tab_taxonomy:
             st.subheader(f"🧬 {target_species} - Taksonomik Detaylar")
@@ -730,6 +1412,69 @@ def main():
                 st.markdown("---")
                 st.markdown("### 🔄 Sinonimler (Eş Anlamlılar)")
                 st.info(species_row['Sinonim'])
+        
+        # --- SEKME 1: COĞRAFİ DAĞILIM / SEKME 3: AKADEMİK YAYINLAR ---
+        # Harita ve yayınlar parça (fragment) olarak çizilir: katman seçimleri
+        # yalnızca kendi bölümlerini yeniden çalıştırır. Sayfa çalıştırmasında
+        # bölümler (ve fotoğraf) yalnızca yer tutucularını çizip kaydolur;
+        # hiçbiri diğerini beklemez, hepsi aşağıda ortak son ana kadar verisi
+        # geldikçe doldurulur
+        # Kapalı sekmeler çalıştırılmaz; sekme açılınca sayfa yeniden çalışır
+        page = {
+            'deadline': render_started + RENDER_BUDGET,
+            'futures': futures,
+            'sections': {"map", "papers"},
+            'waits': {},
+            'renderers': {},
+            'progress': [],
+            'late': {},
+        }
+
+        # Fotoğraf: kalan bütçe içinde gelmezse sonraki çalıştırmada doldurulur
+        def render_image(name, results):
+            if failed_sources(results):
+                image_slot.warning(failure_message(["image"]))
+            elif "image" in results:
+                with image_slot.container():
+                    render_species_image(target_species, results["image"])
+            else:
+                image_slot.info(LOADING_MESSAGE)
+
+        page['waits']["image"] = ["image"]
+        page['renderers']["image"] = render_image
+        
+        if papers_open:
+            with tab_papers:
+                papers_section(target_species, page)
+        
+        if map_open:
+            with tab_map:
+                map_section(
+                    target_species, species_locations, page, data_digest, location_index,
+                    filtered_species, {c: df[c] for c in MAP_GROUP_COLUMNS if c in df.columns},
+                    content_hash(np.packbits(row_mask).tobytes()),
+                )
+        
+        render_page_sections(page)
+        late = page['late']
+        render_seconds = time.monotonic() - render_started
+
+        # Listede komşu ve aynı aileden türler arka planda önceden çekilir
+        family = []
+        if 'Aile' in df.columns and pd.notna(species_row.get('Aile')):
+            family = df.index[row_mask & (df['Aile'] == species_row['Aile']).to_numpy()]
+        start_prefetch(prefetch_key, prefetch_candidates(species_list, target_species, family), prefetch_fetchers)
+
+        with st.sidebar:
+            st.markdown("---")
+            render_unmatched_locations(unmatched_locations)
+            render_cache_stats(precomputed_count)
+            st.caption(
+                f"⏱️ Sayfa {render_seconds:.1f} sn · bütçe {RENDER_BUDGET:g} sn"
+                + (f" · geciken: {', '.join(late)}" if late else "")
+            )
+            if late:
+                wait_for_late_fetches(page_key, late, progress=page['progress'])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,206 @@
+"""Yüklenen CSV/XLSX dosyalarının içerik özetiyle anahtarlanan okuması.
+
+Dosya ilk kez görüldüğünde ayrıştırılır ve sonuç sıkıştırılmamış bir Arrow
+(Feather v2) yan dosyasına yazılır. Aynı içerik yeniden yüklendiğinde, dosya
+adı farklı olsa ya da sunucu yeniden başlamış olsa bile, ayrıştırma yapılmaz;
+yan dosya belleğe eşlenerek (memory-map) okunur.
+
+Excel dosyaları ``pd.read_excel`` yerine openpyxl'in salt okunur akış
+kipinde satır satır okunur; hücre stilleri ve biçimleri yüklenmez.
+
+Bellekte kompakt bir tablo tutulur: taksonomi sütunları kategorik, ``Tür``
+tablonun indeksidir. Uzun serbest metin sütunları (özet, tanım, etki
+bilgisi...) tabloya alınmaz; ``TextStore`` bunları tür seçildikçe yan
+dosyadan tek satır olarak okur. Yan dosya belleğe eşlendiği için bu metinler
+oturumların belleğinde değil işletim sisteminin sayfa önbelleğinde durur.
+
+pyarrow kurulu değilse ya da yan dosya yazılamazsa okuma yine çalışır,
+yalnızca yan dosya önbelleği devre dışı kalır ve metinler bellekte tutulur.
+"""
+import hashlib
+import io
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - pyarrow isteğe bağlı
+    pa = None
+
+# Ayrıştırma biçimi değişirse eski yan dosyalar kullanılmasın diye artırılır
+SIDECAR_VERSION = 2
+SIDECAR_DIR = os.environ.get(
+    "ISTILACI_DATASET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "datasets"),
+)
+
+# Az sayıda farklı değer alan, kategorik tutulan sütunlar
+TAXONOMY_COLUMNS = ('Sistem', 'Alem', 'Şube', 'Sınıf', 'Takım', 'Aile')
+# Tabloda tutulmayıp türe göre istendikçe okunan uzun metin sütunları
+LONG_TEXT_COLUMNS = (
+    'Özet', 'Tür Tanımı', 'Yaşam Alanı', 'Üreme Bilgisi', 'Yaşam Döngüsü',
+    'Beslenme Bilgisi', 'Genel Etki Bilgisi', 'Genel Yönetim Bilgisi',
+    'Genel Giriş Yolu Bilgisi', 'Notlar', 'Yerler',
+)
+
+
+def content_hash(data):
+    """Dosya içeriğinin kısa onaltılık özetini döner"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def sidecar_path(digest):
+    return os.path.join(SIDECAR_DIR, f"{digest}.v{SIDECAR_VERSION}.arrow")
+
+
+def read_excel_streaming(data):
+    """İlk çalışma sayfasını openpyxl salt okunur kipinde tabloya çevirir.
+
+    İlk satır başlık kabul edilir; tamamen boş satırlar atlanır. Metin ile
+    sayının karıştığı sütunlar metne çevrilir ki tablo Arrow'a yazılabilsin.
+    """
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        records = [row for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+
+    columns = [
+        str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)
+    ]
+    width = len(columns)
+    df = pd.DataFrame([row[:width] for row in records], columns=columns).infer_objects()
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        if not values.map(lambda v: v is None or isinstance(v, str)).all():
+            df[column] = values.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+    return df
+
+
+def parse_table(data, filename):
+    """Ham dosya içeriğini uzantısına göre ayrıştırır; sütun adları kırpılır"""
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = read_excel_streaming(data)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _open_sidecar(path, columns=None):
+    """Yan dosyayı belleğe eşleyerek açar; yoksa ya da bozuksa None döner"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return feather.read_table(path, columns=columns, memory_map=True)
+    except (pa.ArrowException, OSError):
+        return None
+
+
+def _write_sidecar(df, path):
+    """Yan dosyayı önce geçici ada yazar, sonra atomik olarak yerine taşır"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(df, tmp, compression='uncompressed')
+        os.replace(tmp, path)
+    except (pa.ArrowException, OSError):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def compact_frame(df):
+    """Boşları doldurur, taksonomi sütunlarını kategoriğe çevirir, ``Tür``ü indeks yapar"""
+    df = df.copy()
+    for column in df.columns:
+        if column in TAXONOMY_COLUMNS:
+            df[column] = df[column].fillna('').astype(str).astype('category')
+        else:
+            df[column] = df[column].fillna('')
+    if 'Tür' in df.columns:
+        df = df.set_index('Tür')
+    return df
+
+
+class TextStore:
+    """Uzun metin sütunlarını türe göre tek satır olarak veren depo.
+
+    Yan dosya varsa yalnızca yolu ve satır numaraları tutulur; tablo ilk
+    istekte belleğe eşlenerek açılır ve nesne kopyalandığında (ör. önbellekten
+    çözülürken) metinler kopyalanmaz. Yan dosya yoksa sütunlar bellekte durur.
+    """
+
+    def __init__(self, columns, species, path=None, data=None):
+        self.columns = list(columns)
+        self.path = path
+        self._data = data
+        self._table = None
+        # Aynı tür birden çok satırda geçerse ilk satır kullanılır
+        self._rows = {}
+        for row, name in enumerate(species):
+            self._rows.setdefault(name, row)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_table'] = None
+        return state
+
+    def _source(self):
+        if self._data is not None:
+            return self._data
+        if self._table is None:
+            self._table = _open_sidecar(self.path, self.columns)
+        return self._table
+
+    def get(self, species):
+        """Türün metinlerini {sütun: metin} olarak döner; tür yoksa boş sözlük"""
+        row = self._rows.get(species)
+        if row is None or not self.columns:
+            return {}
+        source = self._source()
+        if isinstance(source, dict):
+            return {column: source[column][row] for column in self.columns}
+        values = source.slice(row, 1).to_pylist()[0]
+        return {column: values[column] or '' for column in self.columns}
+
+    def column(self, name):
+        """Bir metin sütununun tamamını (boşlar '' olarak) liste halinde döner"""
+        if name not in self.columns:
+            return []
+        source = self._source()
+        if isinstance(source, dict):
+            return source[name]
+        return ['' if value is None else value for value in source.column(name).to_pylist()]
+
+
+def _split(df):
+    """Ayrıştırılmış tabloyu kompakt tabloya ve bellek içi metin deposuna ayırır"""
+    text_columns = [c for c in df.columns if c in LONG_TEXT_COLUMNS]
+    frame = compact_frame(df.drop(columns=text_columns))
+    data = {c: df[c].fillna('').astype(str).tolist() for c in text_columns}
+    return frame, TextStore(text_columns, frame.index, data=data)
+
+
+def open_dataset(data, filename, digest=None):
+    """İçeriği yan dosyadan ya da (ilk seferde) ayrıştırarak açar.
+
+    (kompakt tablo, metin deposu) döner; uzun metinler yan dosyada kalır.
+    """
+    if pa is None:
+        return _split(parse_table(data, filename))
+    path = sidecar_path(digest or content_hash(data))
+    table = _open_sidecar(path)
+    if table is None:
+        df = parse_table(data, filename)
+        _write_sidecar(df, path)
+        table = _open_sidecar(path)
+        if table is None:
+            return _split(df)
+    text_columns = [c for c in table.column_names if c in LONG_TEXT_COLUMNS]
+    frame = compact_frame(table.drop_columns(text_columns).to_pandas())
+    return frame, TextStore(text_columns, frame.index, path=path)
@@ -0,0 +1,147 @@
+"""Filtrelenen türlerin yerel kayıtlarını gazeteer konumu başına toplama.
+
+Tür/yer uzun tablosu (``build_location_index`` çıktısı) bir kez hazırlandığından
+çok türlü harita için metin ayrıştırılmaz: seçili türlerin satırları alınır ve
+(grup, konum) çiftine göre sayılır. Sonuç satır sayısı tür × konum değil,
+konum × gösterilen grup sayısıyla sınırlıdır; haritadaki işaretçi sayısı da
+buna eşittir.
+
+İl düzeyindeki toplamda konum kategorileri önceden hesaplanmış yer → il
+eşlemesiyle bir kez il kodlarına çevrilir; sayım yine kod dizileri üzerinde
+yapılır ve sonuç satır sayısı en fazla il sayısı kadardır.
+"""
+import numpy as np
+import pandas as pd
+
+# Ayrı katman olarak gösterilecek en fazla grup (Aile/Sınıf); kalanlar
+# "Diğer" katmanında toplanır
+MAX_GROUPS = 12
+# Bir konumun açılır penceresinde adı yazılacak en fazla tür
+MAX_NAMES = 8
+OTHER_GROUP = "Diğer"
+UNKNOWN_GROUP = "Belirtilmemiş"
+
+
+def aggregate_locations(location_index, species, groups=None, max_groups=MAX_GROUPS, max_names=MAX_NAMES):
+    """Türlerin kayıtlarını (grup, konum) başına tür sayısı olarak toplar.
+
+    ``groups`` tür adıyla indeksli bir Seri ise (ör. ``df['Aile']``) her tür
+    kendi grubuna yazılır; en çok türü olan ``max_groups`` grup dışındakiler
+    ``OTHER_GROUP`` altında birleşir. Verilmezse tek bir grup oluşur.
+    Dönen tabloda grup, Yer, lat, lon, tür sayısı (``count``), konumdaki tüm
+    grupların toplamı (``total``) ve örnek tür adları (``names``) bulunur.
+    """
+    columns = ['group', 'Yer', 'lat', 'lon', 'count', 'total', 'names']
+    rows = location_index[location_index.index.isin(species)]
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Tablo türe göre sıralı ve tür/yer çiftleri tekil; sayımlar kod dizileriyle yapılır
+    species_codes, species_names = pd.factorize(rows.index)
+    place_codes = rows['Yer'].cat.codes.to_numpy().astype(np.int64)
+    places = rows['Yer'].cat.categories
+    if groups is None:
+        group_names = np.array([""], dtype=object)
+        species_groups = np.zeros(len(species_names), dtype=np.int64)
+    else:
+        groups = groups[~groups.index.duplicated()]
+        labels = groups.reindex(species_names).astype(object).fillna(UNKNOWN_GROUP).astype(str)
+        species_groups, group_names = pd.factorize(labels)
+        group_names = np.asarray(group_names, dtype=object)
+        # Katman sayısını sınırla: en çok türü olan gruplar ayrı, gerisi "Diğer"
+        sizes = np.bincount(species_groups, minlength=len(group_names))
+        if len(group_names) > max_groups:
+            keep = np.argsort(-sizes, kind='stable')[:max_groups]
+            remap = np.full(len(group_names), max_groups, dtype=np.int64)
+            remap[keep] = np.arange(max_groups)
+            species_groups = remap[species_groups]
+            group_names = np.append(group_names[keep], OTHER_GROUP)
+    row_groups = species_groups[species_codes]
+
+    # (grup, konum) çiftleri tek tamsayı anahtara paketlenir
+    keys, inverse = np.unique(row_groups * len(places) + place_codes, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse, minlength=len(keys))
+    totals = np.bincount(place_codes, minlength=len(places))
+    key_groups, key_places = np.divmod(keys, len(places))
+
+    # Her anahtarın ilk ``max_names`` türü (satırlar türe göre sıralı olduğundan alfabetik)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    row_names = np.asarray(rows.index, dtype=object)[order]
+    examples = [
+        ', '.join(row_names[start:start + min(count, max_names)])
+        for start, count in zip(starts.tolist(), counts.tolist())
+    ]
+
+    first_row = np.zeros(len(places), dtype=np.int64)
+    first_row[place_codes[::-1]] = np.arange(len(place_codes))[::-1]
+    lats = rows['lat'].to_numpy()[first_row]
+    lons = rows['lon'].to_numpy()[first_row]
+    result = pd.DataFrame({
+        'group': group_names[key_groups],
+        'Yer': np.asarray(places, dtype=object)[key_places],
+        'lat': lats[key_places],
+        'lon': lons[key_places],
+        'count': counts,
+        'total': totals[key_places],
+        'names': examples,
+    })
+    # Katmanlar en kalabalık gruptan başlar ("Diğer" en sonda), konumlar sayıya göre
+    return result.iloc[np.lexsort((-counts, key_groups))].reset_index(drop=True)
+
+
+def aggregate_provinces(location_index, species, provinces, max_names=MAX_NAMES):
+    """Türlerin kayıtlarını il başına farklı tür sayısı (tür zenginliği) olarak toplar.
+
+    ``provinces`` gazeteer yer adı → il eşlemesidir; ile bağlanamayan yerler
+    (ör. birden çok ile kıyısı olan denizler) sayılmaz. Dönen tabloda il,
+    tür sayısı (``count``), ildeki kayıtlı konum sayısı (``places``) ve örnek
+    tür adları (``names``) bulunur; iller tür sayısına göre sıralıdır.
+    """
+    columns = ['il', 'count', 'places', 'names']
+    rows = location_index[location_index.index.isin(species)]
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Yer kategorisi → il kodu dizisi; satırların ili tek bir dizin işlemidir
+    places = rows['Yer'].cat.categories
+    place_provinces, province_names = pd.factorize(
+        pd.Series(places, dtype=object).map(provinces)
+    )
+    place_codes = rows['Yer'].cat.codes.to_numpy().astype(np.int64)
+    row_provinces = place_provinces[place_codes]
+    known = row_provinces >= 0
+    if not known.any():
+        return pd.DataFrame(columns=columns)
+    species_codes, _ = pd.factorize(rows.index)
+    species_codes, row_provinces = species_codes[known], row_provinces[known]
+    row_names = np.asarray(rows.index, dtype=object)[known]
+
+    # Aynı türün aynı ildeki birden çok konumu tek sayılır; (tür, il) çiftleri
+    # tek tamsayı anahtara paketlenir. Anahtarlar türe göre sıralı olduğundan
+    # il içindeki örnek adlar alfabetiktir.
+    n_provinces = len(province_names)
+    _, first = np.unique(species_codes * n_provinces + row_provinces, return_index=True)
+    pair_provinces, pair_names = row_provinces[first], row_names[first]
+    counts = np.bincount(pair_provinces, minlength=n_provinces)
+    place_counts = np.bincount(
+        place_provinces[np.unique(place_codes[known])], minlength=n_provinces
+    )
+
+    order = np.argsort(pair_provinces, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sorted_names = pair_names[order]
+    examples = [
+        ', '.join(sorted_names[start:start + min(count, max_names)])
+        for start, count in zip(starts.tolist(), counts.tolist())
+    ]
+    result = pd.DataFrame({
+        'il': np.asarray(province_names, dtype=object),
+        'count': counts,
+        'places': place_counts,
+        'names': examples,
+    })
+    # Kategoriler tüm veri kümesinindir; filtrede kaydı kalmayan iller atılır
+    order = np.lexsort((result['il'].to_numpy(), -counts))
+    return result.iloc[order[counts[order] > 0]].reset_index(drop=True)
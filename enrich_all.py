@@ -0,0 +1,107 @@
+"""Listedeki tüm türler için uzak verileri önceden çeken toplu iş.
+
+Her tür için GBIF anahtarı, iNaturalist takson kimliği, fotoğraf adresi,
+koordinatlı kayıt sayısı ve en ilgili makaleler çekilir; sonuçlar uygulamanın
+açılışta okuduğu yan dosyaya (JSON Lines, tür başına bir satır) eklenir.
+
+Her tür tamamlanır tamamlanmaz dosyaya yazıldığından iş yarıda kesilirse
+yeniden çalıştırıldığında kaldığı yerden devam eder; başarısız olan türler
+dosyaya yazılmaz ve sonraki çalıştırmada yeniden denenir.
+
+Kullanım:
+    python enrich_all.py "İstilacı Türler Listesi.csv" --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dataset import content_hash, open_dataset
+from names import canonical_names, register as register_canonical_names
+from species_api import PRECOMPUTED_PATH, fetch_papers, fetch_species_record, read_precomputed
+from synonyms import SynonymIndex, register as register_synonyms
+
+
+def load_species(path):
+    """Veri dosyasını açar, kanonik adları ve sinonimleri kaydeder, tür adlarını döner"""
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    df, _ = open_dataset(data, os.path.basename(path), content_hash(data))
+    register_canonical_names(dict(zip(df.index, canonical_names(df.index))))
+    if 'Sinonim' in df.columns:
+        register_synonyms(SynonymIndex(df.index, df['Sinonim'].fillna('')))
+    return list(dict.fromkeys(str(name) for name in df.index if str(name).strip()))
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as fh:
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) == b"\n"
+
+
+def enrich(species_name, papers_limit):
+    """Bir türün yan dosyaya yazılacak satırını hazırlar"""
+    return {
+        'name': species_name,
+        'species': fetch_species_record(species_name),
+        'papers': fetch_papers(species_name, papers_limit),
+        'papers_limit': papers_limit,
+        'fetched_at': time.time(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tüm türler için uzak verileri önceden çeker")
+    parser.add_argument("dataset", help="CSV veya Excel tür listesi")
+    parser.add_argument("--output", default=PRECOMPUTED_PATH, help="yan dosya (JSON Lines)")
+    parser.add_argument("--workers", type=int, default=8, help="eşzamanlı tür sayısı")
+    parser.add_argument("--papers", type=int, default=10, help="tür başına makale sayısı")
+    parser.add_argument("--refresh", action="store_true", help="dosyadaki türleri de yeniden çek")
+    args = parser.parse_args(argv)
+
+    species = load_species(args.dataset)
+    done = {} if args.refresh else read_precomputed(args.output)
+    pending = [
+        name for name in species
+        if name not in done or done[name].get('papers_limit', 0) < args.papers
+    ]
+    print(f"{len(species)} tür, {len(species) - len(pending)} tanesi zaten hazır, {len(pending)} çekilecek")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    failed = []
+    executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="enrich")
+    with open(args.output, 'a+', encoding='utf-8') as out:
+        # Önceki çalışma satır ortasında kesildiyse yarım satır kapatılır
+        if out.tell() and not _ends_with_newline(args.output):
+            out.write("\n")
+        futures = {executor.submit(enrich, name, args.papers): name for name in pending}
+        try:
+            for i, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as exc:
+                    failed.append(name)
+                    print(f"[{i}/{len(pending)}] {name}: HATA ({exc})", file=sys.stderr)
+                    continue
+                # Yazma yalnızca bu döngüde yapılır; her satır tamamlanınca diske
+                # aktarılır, kesilen iş buradan devam eder
+                out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                out.flush()
+                print(f"[{i}/{len(pending)}] {name}")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            print("Durduruldu; yeniden çalıştırınca kalan türlerden devam edilecek", file=sys.stderr)
+            return 130
+    executor.shutdown()
+
+    if failed:
+        print(f"{len(failed)} tür çekilemedi; yeniden çalıştırınca tekrar denenecek", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
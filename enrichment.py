@@ -0,0 +1,227 @@
+"""Tür sayfasının uzak veri kaynaklarını paralel çeken zenginleştirme katmanı.
+
+Her kaynak (fotoğraf, GBIF, iNaturalist, makaleler) süreç genelindeki ortak bir
+iş parçacığı havuzuna aynı anda gönderilir; sayfa bölümleri, bağımlı oldukları
+kaynaklar tamamlandıkça sırayla çizilir.
+
+Tür çizildikten sonra listede komşu olan ve aynı aileden türlerin kaynakları
+ayrı, küçük bir havuzda önceden çekilir; kullanıcı başka türe geçtiğinde
+henüz başlamamış ön çekmeler iptal edilir. Ön çekme istekleri API'lerin
+jeton kovalarında kullanıcı istekleri için pay bırakır; pay yetmezse o
+kaynağı ağdan çekmez, yalnızca önbellekte olanlar ısınır.
+
+Sayfa bir süre bütçesiyle çizilir: bütçe dolduğunda tamamlanmamış kaynaklar
+beklenmez, bölümleri "yükleniyor" olarak bırakılır ve çekme arka planda sürer.
+Sayfalı kaynaklar (``PagedFetch``) toplanırken ilerlemeleri okunabilir; bölüm
+tamamlanmayı beklemeden ara sonuçla yeniden çizilebilir.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+from http_client import HttpError, background_requests
+
+# Tüm oturumların paylaştığı havuz; istekler ağ beklemesi olduğundan
+# çekirdek sayısından bağımsız, kaynak sayısının birkaç katı tutulur.
+MAX_WORKERS = 16
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="enrichment")
+
+# Bir çalıştırmada uzak kaynaklar için beklenecek en uzun süre (saniye)
+RENDER_BUDGET = float(os.environ.get("ISTILACI_RENDER_BUDGET", "3"))
+
+# Ön çekme havuzu ayrı ve küçüktür; görüntülenen türün istekleri önce gelir
+PREFETCH_WORKERS = 4
+# Seçili türün önünden ve arkasından ısıtılacak tür sayısı
+PREFETCH_NEIGHBOURS = 3
+# Aynı aileden ısıtılacak en fazla tür sayısı
+PREFETCH_FAMILY_LIMIT = 6
+# Ön çekmenin her API'nin jeton kovasında dokunmadığı pay (0–1)
+PREFETCH_RESERVE = float(os.environ.get("ISTILACI_PREFETCH_RESERVE", "0.5"))
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def start_enrichment(species_name, fetchers):
+    """Her kaynağın çekme fonksiyonunu havuza gönderir, {kaynak: Future} döner"""
+    return {
+        source: _executor.submit(fetch, species_name)
+        for source, fetch in fetchers.items()
+    }
+
+
+def _result_or_error(future):
+    """Future sonucunu döner; çekme sırasında hata olduysa istisnanın kendisini döner"""
+    try:
+        return future.result()
+    except Exception as exc:
+        return exc
+
+
+def iter_ready_sections(futures, sections, deadline=None):
+    """Bağımlı olduğu tüm kaynaklar tamamlanan bölümleri hazır oldukça verir.
+
+    ``sections`` {bölüm: [kaynak, ...]} biçimindedir; her bölüm için bir kez
+    (bölüm, {kaynak: sonuç}) üretilir. Hata veren kaynağın sonucu istisnanın
+    kendisidir (bkz. ``failed_sources``). Kaynağı olmayan bölümler hemen verilir.
+    ``deadline`` (``time.monotonic()`` cinsinden) geçtiğinde kalan bölümler
+    yalnızca tamamlanmış kaynaklarıyla verilir; eksik kaynaklar sözlükte yer
+    almaz ve arka planda çalışmayı sürdürür.
+    """
+    pending = {name: set(deps) for name, deps in sections.items()}
+    results = {}
+
+    def ready():
+        for name in [n for n, deps in pending.items() if deps <= results.keys()]:
+            deps = pending.pop(name)
+            yield name, {source: results[source] for source in deps}
+
+    yield from ready()
+    by_future = {future: source for source, future in futures.items()}
+    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+    try:
+        for future in as_completed(by_future, timeout=timeout):
+            results[by_future[future]] = _result_or_error(future)
+            yield from ready()
+    except TimeoutError:
+        for name, deps in list(pending.items()):
+            del pending[name]
+            yield name, {source: results[source] for source in deps if source in results}
+
+
+def failed_sources(results):
+    """Sonuçları istisna olan (çekilemeyen) kaynakların adlarını döner"""
+    return [source for source, value in results.items() if isinstance(value, Exception)]
+
+
+def prefetch_candidates(species_list, current, family=(), neighbours=PREFETCH_NEIGHBOURS,
+                        family_limit=PREFETCH_FAMILY_LIMIT):
+    """Seçili türden sonra en olası türleri yakından uzağa sıralı döner.
+
+    Önce listede bir sonraki ve bir önceki tür, sonra ikişer uzaktakiler
+    gelir; ardından aynı ailedeki türler eklenir.
+    """
+    species_list = list(species_list)
+    try:
+        position = species_list.index(current)
+    except ValueError:
+        position = None
+    candidates = []
+    if position is not None:
+        for step in range(1, neighbours + 1):
+            for i in (position + step, position - step):
+                if 0 <= i < len(species_list):
+                    candidates.append(species_list[i])
+    candidates.extend([name for name in family if name != current][:family_limit])
+    return [name for name in dict.fromkeys(candidates) if name != current]
+
+
+class PagedFetch:
+    """Sayfa sayfa gelen bir kaynağı havuzda bir kez toplayan iş.
+
+    ``pages`` her çağrıda kayıt listeleri üreten bir üreteç döndürür. ``run``
+    çekme fonksiyonu olarak havuza verilir; sayfalar geldikçe ``count`` ve
+    ``snapshot`` ile ilerleme okunabilir. ``budget`` saniye dolunca toplama
+    durur (``truncated``); ağ hatasında o ana kadarki kayıtlar
+    ``complete=False`` ile döner. ``run`` yeniden çağrılırsa yeniden
+    toplanmaz, ilk çağrının sonucu beklenir.
+    """
+
+    def __init__(self, pages, budget):
+        self._pages = pages
+        self._budget = budget
+        self._records = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._finished = threading.Event()
+        self._cancelled = threading.Event()
+        self._result = None
+        self._error = None
+        # Sonucun kullanıcıya gösterildiği işaretlenir (bkz. ``app_yeni.gbif_pages``)
+        self.reported = False
+
+    def run(self, *args):
+        """Sayfaları toplar; {'records', 'complete', 'truncated'} döner"""
+        with self._lock:
+            first, self._started = not self._started, True
+        if not first:
+            self._finished.wait()
+            if self._error is not None:
+                raise self._error
+            return self._result
+        complete, truncated = True, False
+        give_up = time.monotonic() + self._budget
+        try:
+            for records in self._pages():
+                with self._lock:
+                    self._records.extend(records)
+                if self._cancelled.is_set() or time.monotonic() > give_up:
+                    truncated = True
+                    break
+        except HttpError:
+            complete = False
+        except Exception as exc:
+            self._error = exc
+            self._finished.set()
+            raise
+        self._result = {'records': self._records, 'complete': complete, 'truncated': truncated}
+        self._finished.set()
+        return self._result
+
+    @property
+    def count(self):
+        """Şu ana kadar toplanan kayıt sayısı"""
+        with self._lock:
+            return len(self._records)
+
+    def snapshot(self):
+        """Şu ana kadar toplanan kayıtların kopyası"""
+        with self._lock:
+            return list(self._records)
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def result(self):
+        """Tamamlandıysa ``run`` sonucu, değilse ``None``"""
+        return self._result if self.done else None
+
+    def cancel(self):
+        """Toplamayı bir sonraki sayfadan sonra durdurur"""
+        self._cancelled.set()
+
+
+class Prefetch:
+    """Bir oturumun arka planda önbelleğe aldığı türler.
+
+    Her tür için kaynaklar sırayla, düşük öncelikli istekler olarak çağrılır;
+    sonuçlar atılır, yalnızca yardımcıların önbellekleri ısınır. Kovada pay
+    kalmadığı için ertelenen kaynak atlanır. ``cancel`` kuyruktaki türleri
+    havuzdan çıkarır, çalışmakta olanları bir sonraki kaynaktan önce durdurur.
+    """
+
+    def __init__(self, species_names, fetchers):
+        self.species = list(species_names)
+        self._cancelled = threading.Event()
+        self._futures = [
+            _prefetch_executor.submit(self._warm, name, list(fetchers.values()))
+            for name in self.species
+        ]
+
+    def _warm(self, species_name, fetchers):
+        with background_requests(PREFETCH_RESERVE):
+            for fetch in fetchers:
+                if self._cancelled.is_set():
+                    return
+                try:
+                    fetch(species_name)
+                except Exception:
+                    pass
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
@@ -0,0 +1,112 @@
+"""Taksonomi filtreleri için bit eşlemli fasetli arama dizini.
+
+Her (sütun, değer) çifti için satırların bit eşlemi (``np.packbits`` ile
+sıkıştırılmış boolean dizi) veri kümesi başına bir kez hazırlanır. Filtre
+uygulamak seçili değerlerin eşlemlerini VEYA'layıp sütunlar arasında VE'lemek
+demektir; tablo taranmaz, ara tablo oluşturulmaz.
+
+Her sütunun seçenek sayıları, o sütun dışındaki filtrelere göre hesaplanır
+(ör. Alem seçilince Şube/Sınıf/Takım/Aile seçenekleri ve sayıları daralır,
+Alem'in kendi seçenekleri ise görünür kalır).
+"""
+import numpy as np
+
+
+class FacetIndex:
+    """Kategorik sütunlar için (sütun, değer) bit eşlemleri ve sayımlar"""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.columns = [c for c in columns if c in df.columns]
+        self.values = {}
+        self.codes = {}
+        self.bitmaps = {}
+        self.totals = {}
+        self._positions = {}
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+        for column in self.columns:
+            categorical = df[column].astype('category').array
+            values = [str(v) for v in categorical.categories]
+            codes = np.asarray(categorical.codes)
+            self.values[column] = values
+            # Boş (NaN) hücreler sayımda en sondaki fazladan kutuya düşer
+            self.codes[column] = np.where(codes >= 0, codes, len(values))
+            self._positions[column] = {v: i for i, v in enumerate(values)}
+            # Her satırın bitini kendi değerinin eşlemine yazar (packbits ile
+            # aynı düzen: bayt içinde en anlamlı bit ilk satırdır)
+            bitmaps = np.zeros((len(values), len(self._all)), dtype=np.uint8)
+            rows = np.flatnonzero(codes >= 0)
+            np.bitwise_or.at(
+                bitmaps, (codes[rows], rows >> 3), (0x80 >> (rows & 7)).astype(np.uint8)
+            )
+            self.bitmaps[column] = bitmaps
+            self.totals[column] = np.bincount(codes[rows], minlength=len(values))
+
+    def value_mask(self, column, selected):
+        """Sütunda seçili değerlerden birini taşıyan satırların eşlemi.
+
+        Seçim boşsa ya da tüm değerleri kapsıyorsa kısıt yoktur, None döner.
+        Değerlerin yarısından fazlası seçiliyse seçilmeyenlerin tümleyeni
+        alınır; böylece en fazla yarı sayıda eşlem VEYA'lanır.
+        """
+        positions = self._positions[column]
+        picked = sorted({positions[v] for v in selected if v in positions})
+        n_values = len(self.values[column])
+        if not selected or len(picked) == n_values:
+            return None
+        if len(picked) <= n_values // 2:
+            return np.bitwise_or.reduce(self.bitmaps[column][picked], axis=0) if picked else np.zeros_like(self._all)
+        rest = np.setdiff1d(np.arange(n_values), picked)
+        return ~np.bitwise_or.reduce(self.bitmaps[column][rest], axis=0) & self._all
+
+    def _masks(self, selections):
+        return {
+            column: mask for column in self.columns
+            if (mask := self.value_mask(column, selections.get(column) or ())) is not None
+        }
+
+    def _combine(self, masks, exclude=None):
+        result = self._all
+        for column, mask in masks.items():
+            if column != exclude:
+                result = result & mask
+        return result
+
+    def rows(self, selections):
+        """Tüm filtrelere uyan satırlar için boolean dizi döner"""
+        packed = self._combine(self._masks(selections))
+        return np.unpackbits(packed, count=self.n_rows).view(bool)
+
+    def _count(self, column, selected):
+        """Seçili satırlardaki değer sayıları (boolean dizi verilir).
+
+        Satırların yarısından fazlası seçiliyse seçilmeyenler sayılıp
+        toplamdan çıkarılır; iş en fazla yarı satır kadardır.
+        """
+        n_values = len(self.values[column])
+        codes = self.codes[column]
+        if selected.sum() * 2 <= self.n_rows:
+            return np.bincount(codes[selected], minlength=n_values + 1)[:n_values]
+        rest = np.bincount(codes[~selected], minlength=n_values + 1)[:n_values]
+        return self.totals[column] - rest
+
+    def counts(self, selections):
+        """Her sütun için değer başına satır sayılarını döner.
+
+        Bir sütunun sayıları yalnızca diğer sütunlardaki seçimlere göre
+        hesaplanır. Kısıt yoksa yükleme sırasında sayılmış toplamlar kullanılır.
+        """
+        masks = self._masks(selections)
+        selected_rows = {}
+        result = {}
+        for column in self.columns:
+            others = tuple(c for c in masks if c != column)
+            if not others:
+                result[column] = self.totals[column]
+                continue
+            # Aynı "diğer filtreler" kümesi birden çok sütunda tekrar eder
+            if others not in selected_rows:
+                packed = self._combine(masks, exclude=column)
+                selected_rows[others] = np.unpackbits(packed, count=self.n_rows).view(bool)
+            result[column] = self._count(column, selected_rows[others])
+        return result
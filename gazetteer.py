@@ -0,0 +1,250 @@
+"""Yerler sütunundaki yer adlarını koordinatlara çeviren gazeteer.
+
+Yer adları Türkçe büyük/küçük harf kurallarıyla küçültülüp aksanlarından
+arındırılarak dizinlenir ("İzmir ", "izmir" ve "IZMIR" aynı anahtara düşer).
+Bulunamayan adlar sırasıyla şu yollarla denenir:
+
+1. "Körfezi", "Limanı" gibi coğrafi ek sözcükler atılmış hali,
+2. bileşik adların parçaları ("İskenderun, Hatay", "Göcek-Fethiye Körfezi");
+   en özel yer genellikle ilk parça olduğundan parçalar soldan denenir,
+3. üçlü harf (trigram) dizini üzerinden bulanık eşleşme; aday adın ham
+   adın tamamını karşılaması gerekir ("Kemerköy" → "Kemer" eşleşmez), kısa
+   adaylar için eşik daha yüksektir.
+
+Ham adların sonuçları sınırlı bir LRU önbelleğinde tutulduğundan, büyük
+tablolarda tekrar eden adların çözümü sözlük erişimi kadar ucuzdur.
+"""
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+# --- Lokasyon Koordinat Sözlüğü ---
+location_coords = {
+    "İstanbul": [41.0082, 28.9784], "Büyükada": [40.8741, 29.1293], "Haliç": [41.0289, 28.9697],
+    "Büyükçekmece Körfezi": [40.9922, 28.5671], "Marmara Denizi": [40.7500, 28.2500],
+    "Çanakkale": [40.153, 26.405], "Çanakkale Boğazı": [40.2000, 26.4000],
+    "Abide": [40.0503, 26.2192], "Kilitbahir": [40.1472, 26.3797], "Eceabat": [40.1850, 26.3575],
+    "Gelibolu": [40.4100, 26.6700], "Lapseki": [40.3444, 26.6853], "Yapıldak": [40.2078, 26.5492],
+    "Şevketiye": [40.3955, 26.8716], "Burhanlı Mevkii": [40.3069, 26.5593],
+    "Gökçeada": [40.1889, 25.9044], "Bozcaada": [39.8322, 26.0719],
+    "Balıkesir": [39.6484, 27.8826], "Bandırma": [40.3533, 27.9708], "Bandırma Körfezi": [40.3800, 27.9500],
+    "Edremit Körfezi": [39.5333, 26.8500], "Ayvalık": [39.3190, 26.6960],
+    "Bursa": [40.1885, 29.0610], "Yalova": [40.6549, 29.2842], "Hersek Lagünü": [40.7239, 29.5046],
+    "Kocaeli": [40.8533, 29.8815], "İzmit": [40.7654, 29.9408], "İzmit Körfezi": [40.7300, 29.7000],
+    "Sakarya": [40.7569, 30.3783], "Tekirdağ": [40.9780, 27.5110], "Edirne": [41.6772, 26.5557],
+    "Kırklareli": [41.7355, 27.2244], "Bilecik": [40.1419, 29.9793],
+    "İzmir": [38.4237, 27.1428], "İzmir Körfezi": [38.4500, 26.9000], "Alsancak Limanı": [38.4410, 27.1480],
+    "Levent Marina": [38.4090, 27.0850], "Aliağa": [38.7994, 26.9723],
+    "Karaburun": [38.6394, 26.5125], "Ildır": [38.3842, 26.4764], "Çeşme": [38.3232, 26.3039],
+    "Seferihisar": [38.2047, 26.8378], "Sığacık": [38.2000, 26.7800], "Urla": [38.3229, 26.7635],
+    "Dikili": [39.0717, 26.8872], "Dikili Açıkları": [39.0700, 26.8500],
+    "Muğla": [37.2154, 28.3636], "Gökova Körfezi": [36.9500, 28.1000], "Akyaka": [37.0536, 28.3264],
+    "Marmaris": [36.8550, 28.2742], "Bodrum": [37.0344, 27.4305],
+    "Fethiye": [36.6217, 29.1164], "Fethiye Körfezi": [36.6500, 29.0500],
+    "Göcek": [36.7550, 28.9380], "Dalyan": [36.8350, 28.6430],
+    "İztuzu": [36.7900, 28.6100], "Datça Yarımadası": [36.7300, 27.6800],
+    "Kuşadası": [37.8579, 27.2610], "Kuşadası Körfezi": [37.9000, 27.2000],
+    "Aydın": [37.8444, 27.8458], "Manisa": [38.6191, 27.4289], "Denizli": [37.7765, 29.0864],
+    "Antalya": [36.8969, 30.7133], "Antalya Körfezi": [36.7500, 30.8000], "Belek": [36.8622, 31.0556],
+    "Kemer": [36.5969, 30.5597], "Kaş": [36.2000, 29.6333], "Kalkan": [36.2650, 29.4130],
+    "Finike": [36.2944, 30.1464], "Alanya": [36.5437, 31.9998],
+    "Mersin": [36.8121, 34.6415], "Anamur": [36.0750, 32.8358], "Silifke": [36.3778, 33.9278],
+    "Adana": [37.0000, 35.3213], "Karataş": [36.5700, 35.3800], "Yumurtalık": [36.7720, 35.7930],
+    "Hatay": [36.2023, 36.1606], "İskenderun": [36.5867, 36.1642], "İskenderun Körfezi": [36.6660, 35.9550],
+    "Arsuz": [36.4100, 35.8800], "Samandağ": [36.0833, 35.9667],
+    "Trabzon": [41.0027, 39.7168], "Rize": [41.0201, 40.5234], "Artvin": [41.1828, 41.8183],
+    "Giresun": [40.9128, 38.3895], "Ordu": [40.9839, 37.8764], "Samsun": [41.2867, 36.3300],
+    "Sinop": [42.0231, 35.1531], "Zonguldak": [41.4564, 31.7936], "Bartın": [41.6344, 32.3375],
+    "Kastamonu": [41.3887, 33.7827], "Bolu": [40.7350, 31.6061], "Düzce": [40.8438, 31.1565],
+    "Ankara": [39.9334, 32.8597], "Eskişehir": [39.7667, 30.5256], "Konya": [37.8667, 32.4800],
+    "Kayseri": [38.7312, 35.4787], "Sivas": [39.7477, 37.0163],
+    "Erzurum": [39.9043, 41.2691], "Van": [38.4891, 43.4089], "Elazığ": [38.6810, 39.2264],
+    "Malatya": [38.3552, 38.3095], "Diyarbakır": [37.9144, 40.2306], "Şanlıurfa": [37.1591, 38.7969],
+    "Gaziantep": [37.0662, 37.3833], "Iğdır": [39.9237, 44.0450],
+    "Adıyaman": [37.7648, 38.2786], "Afyonkarahisar": [38.7507, 30.5567], "Ağrı": [39.7191, 43.0503],
+    "Aksaray": [38.3687, 34.0370], "Amasya": [40.6499, 35.8353], "Ardahan": [41.1105, 42.7022],
+    "Batman": [37.8812, 41.1351], "Bayburt": [40.2552, 40.2249], "Bingöl": [38.8847, 40.4939],
+    "Bitlis": [38.4006, 42.1095], "Burdur": [37.7203, 30.2908], "Çankırı": [40.6013, 33.6134],
+    "Çorum": [40.5506, 34.9556], "Erzincan": [39.7500, 39.5000], "Gümüşhane": [40.4386, 39.5086],
+    "Hakkari": [37.5744, 43.7408], "Isparta": [37.7648, 30.5566], "Kahramanmaraş": [37.5858, 36.9371],
+    "Karabük": [41.2061, 32.6204], "Karaman": [37.1759, 33.2287], "Kars": [40.6013, 43.0975],
+    "Kilis": [36.7184, 37.1212], "Kırıkkale": [39.8468, 33.5153], "Kırşehir": [39.1425, 34.1709],
+    "Kütahya": [39.4167, 29.9833], "Mardin": [37.3212, 40.7245], "Muş": [38.9462, 41.7539],
+    "Nevşehir": [38.6939, 34.6857], "Niğde": [37.9667, 34.6833], "Osmaniye": [37.0742, 36.2478],
+    "Siirt": [37.9333, 41.9500], "Şırnak": [37.5164, 42.4611], "Tokat": [40.3167, 36.5500],
+    "Tunceli": [39.1079, 39.5401], "Uşak": [38.6823, 29.4082], "Yozgat": [39.8181, 34.8147]
+}
+
+# 81 il; sözlükte hepsi il merkezinin koordinatıyla bulunur
+PROVINCES = (
+    "Adana", "Adıyaman", "Afyonkarahisar", "Ağrı", "Aksaray", "Amasya", "Ankara", "Antalya",
+    "Ardahan", "Artvin", "Aydın", "Balıkesir", "Bartın", "Batman", "Bayburt", "Bilecik",
+    "Bingöl", "Bitlis", "Bolu", "Burdur", "Bursa", "Çanakkale", "Çankırı", "Çorum",
+    "Denizli", "Diyarbakır", "Düzce", "Edirne", "Elazığ", "Erzincan", "Erzurum", "Eskişehir",
+    "Gaziantep", "Giresun", "Gümüşhane", "Hakkari", "Hatay", "Iğdır", "Isparta", "İstanbul",
+    "İzmir", "Kahramanmaraş", "Karabük", "Karaman", "Kars", "Kastamonu", "Kayseri", "Kilis",
+    "Kırıkkale", "Kırklareli", "Kırşehir", "Kocaeli", "Konya", "Kütahya", "Malatya", "Manisa",
+    "Mardin", "Mersin", "Muğla", "Muş", "Nevşehir", "Niğde", "Ordu", "Osmaniye",
+    "Rize", "Sakarya", "Samsun", "Siirt", "Sinop", "Sivas", "Şanlıurfa", "Şırnak",
+    "Tekirdağ", "Tokat", "Trabzon", "Tunceli", "Uşak", "Van", "Yalova", "Yozgat", "Zonguldak",
+)
+
+# İl olmayan yerlerin bağlı olduğu il. Birden çok ile kıyısı olan denizler
+# (Marmara Denizi) hiçbir ile yazılmaz; körfezler kıyısının çoğunun ait olduğu
+# ile yazılır.
+_PLACE_PROVINCES = {
+    "Büyükada": "İstanbul", "Haliç": "İstanbul", "Büyükçekmece Körfezi": "İstanbul",
+    "Marmara Denizi": None,
+    "Çanakkale Boğazı": "Çanakkale", "Abide": "Çanakkale", "Kilitbahir": "Çanakkale",
+    "Eceabat": "Çanakkale", "Gelibolu": "Çanakkale", "Lapseki": "Çanakkale",
+    "Yapıldak": "Çanakkale", "Şevketiye": "Çanakkale", "Burhanlı Mevkii": "Çanakkale",
+    "Gökçeada": "Çanakkale", "Bozcaada": "Çanakkale",
+    "Bandırma": "Balıkesir", "Bandırma Körfezi": "Balıkesir", "Edremit Körfezi": "Balıkesir",
+    "Ayvalık": "Balıkesir",
+    "Hersek Lagünü": "Yalova", "İzmit": "Kocaeli", "İzmit Körfezi": "Kocaeli",
+    "İzmir Körfezi": "İzmir", "Alsancak Limanı": "İzmir", "Levent Marina": "İzmir",
+    "Aliağa": "İzmir", "Karaburun": "İzmir", "Ildır": "İzmir", "Çeşme": "İzmir",
+    "Seferihisar": "İzmir", "Sığacık": "İzmir", "Urla": "İzmir", "Dikili": "İzmir",
+    "Dikili Açıkları": "İzmir",
+    "Gökova Körfezi": "Muğla", "Akyaka": "Muğla", "Marmaris": "Muğla", "Bodrum": "Muğla",
+    "Fethiye": "Muğla", "Fethiye Körfezi": "Muğla", "Göcek": "Muğla", "Dalyan": "Muğla",
+    "İztuzu": "Muğla", "Datça Yarımadası": "Muğla",
+    "Kuşadası": "Aydın", "Kuşadası Körfezi": "Aydın",
+    "Antalya Körfezi": "Antalya", "Belek": "Antalya", "Kemer": "Antalya", "Kaş": "Antalya",
+    "Kalkan": "Antalya", "Finike": "Antalya", "Alanya": "Antalya",
+    "Anamur": "Mersin", "Silifke": "Mersin",
+    "Karataş": "Adana", "Yumurtalık": "Adana",
+    "İskenderun": "Hatay", "İskenderun Körfezi": "Hatay", "Arsuz": "Hatay", "Samandağ": "Hatay",
+}
+
+# Sözlükteki her yer → ili (il merkezleri kendilerine); il haritası bu
+# eşlemeyle yer kategorilerinden bir kez türetilir
+location_provinces = {
+    name: name if name in PROVINCES else _PLACE_PROVINCES.get(name)
+    for name in location_coords
+}
+
+# Sık kullanılan kısaltma ve eski adlar
+location_aliases = {
+    "Afyon": "Afyonkarahisar", "K.Maraş": "Kahramanmaraş", "Maraş": "Kahramanmaraş",
+    "İçel": "Mersin", "Antep": "Gaziantep", "Urfa": "Şanlıurfa",
+}
+
+# Bileşik adları bölen ayraçlar: virgül, tire, eğik çizgi ve parantez
+_COMPOUND_SPLIT = re.compile(r"\s*[,;/()\-–]\s*")
+# Yer adına eklenen ve tek başına bir yeri belirtmeyen coğrafi sözcükler
+# (normalleştirilmiş halleriyle)
+FEATURE_WORDS = {
+    "korfezi", "limani", "marina", "marinasi", "aciklari", "mevkii", "laguni",
+    "bogazi", "denizi", "yarimadasi", "adasi", "golu", "baraji", "koyu",
+    "burnu", "kiyisi", "kiyilari", "sahili", "deltasi", "cayi", "irmagi",
+}
+
+_TR_CASE = str.maketrans({"I": "ı", "İ": "i"})
+_TR_ASCII = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+# Ayrıştırılmış (NFKD) metindeki birleşen aksan işaretleri
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+
+
+def normalize_name(name):
+    """Adı Türkçe kurallarla küçültür, aksanları atar ve boşlukları sadeleştirir"""
+    text = str(name).translate(_TR_CASE).lower().translate(_TR_ASCII)
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text).split())
+
+
+# Çözülmüş ham ad önbelleğinin büyüklüğü
+LOOKUP_CACHE_SIZE = 65536
+# Bu uzunluğa kadar (normalleştirilmiş) adaylar için bulanık eşik
+SHORT_KEY_LENGTH = 5
+SHORT_KEY_THRESHOLD = 0.8
+
+
+def _trigrams(key):
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """Normalleştirilmiş anahtarlarla yer adı → koordinat dizini"""
+
+    def __init__(self, coords, aliases=None, provinces=None, fuzzy_threshold=0.6):
+        self.coords = dict(coords)
+        self.provinces = {name: (provinces or {}).get(name) for name in self.coords}
+        self.fuzzy_threshold = fuzzy_threshold
+        self._by_key = {}
+        for name in self.coords:
+            self._by_key.setdefault(normalize_name(name), name)
+        for alias, name in (aliases or {}).items():
+            self._by_key.setdefault(normalize_name(alias), name)
+
+        self._trigram_sizes = {}
+        self._trigram_index = {}
+        for key in self._by_key:
+            grams = _trigrams(key)
+            self._trigram_sizes[key] = len(grams)
+            for gram in grams:
+                self._trigram_index.setdefault(gram, []).append(key)
+
+        self._cached_resolve = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._resolve)
+
+    def _exact(self, text):
+        """Normalleştirilmiş ad ya da coğrafi ek sözcükleri atılmış hali"""
+        key = normalize_name(text)
+        if key in self._by_key:
+            return self._by_key[key]
+        words = [w for w in key.split() if w not in FEATURE_WORDS]
+        return self._by_key.get(" ".join(words)) if words else None
+
+    def _fuzzy(self, text):
+        """Trigram Dice benzerliği eşiği geçen en yakın anahtarı döner.
+
+        Ham adın trigramlarının da en az eşik oranında adayda bulunması
+        gerekir; böylece yalnızca adın başını karşılayan kısa bir aday
+        ("Kemerköy" için "Kemer") kabul edilmez. Kısa adaylar
+        ``SHORT_KEY_THRESHOLD`` eşiğini geçmelidir.
+        """
+        key = normalize_name(text)
+        grams = _trigrams(key)
+        if not key or not grams:
+            return None
+        shared = Counter(
+            candidate for gram in grams for candidate in self._trigram_index.get(gram, ())
+        )
+        best, best_score = None, self.fuzzy_threshold
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + self._trigram_sizes[candidate])
+            if count / len(grams) < self.fuzzy_threshold:
+                continue
+            if len(candidate) <= SHORT_KEY_LENGTH and score < SHORT_KEY_THRESHOLD:
+                continue
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._by_key[best] if best else None
+
+    def _resolve(self, raw):
+        parts = [p for p in _COMPOUND_SPLIT.split(raw) if p.strip()]
+        candidates = [raw] + (parts if len(parts) > 1 else [])
+        for strategy in (self._exact, self._fuzzy):
+            for text in candidates:
+                name = strategy(text)
+                if name:
+                    return name
+        return None
+
+    def lookup(self, raw):
+        """Ham yer adını sözlükteki adına çevirir; bulunamazsa None döner"""
+        raw = str(raw).strip()
+        if not raw:
+            return None
+        return self._cached_resolve(raw)
+
+    def resolve_series(self, names):
+        """Bir pandas serisindeki adları çözer; her farklı ad yalnızca bir kez çözülür"""
+        uniques = names.dropna().unique()
+        return names.map({raw: self.lookup(raw) for raw in uniques})
+
+
+GAZETTEER = Gazetteer(location_coords, location_aliases, location_provinces)
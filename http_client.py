@@ -0,0 +1,277 @@
+"""GBIF, iNaturalist ve Semantic Scholar çağrılarının ortak HTTP istemcisi.
+
+Her API için tek bir ``ApiClient`` tutulur:
+
+- bağlantılar API başına bir ``requests.Session`` havuzunda canlı tutulur
+  (her istekte yeniden TCP+TLS el sıkışması yapılmaz),
+- istekler API'nin izin verdiği hızda bir jeton kovasından geçer,
+- bağlantı hataları, 429 ve 5xx yanıtları üstel geri çekilmeyle yeniden denenir,
+- art arda başarısız olan API bir süre için devre dışı bırakılır; bu sürede
+  istekler zaman aşımı beklemeden ``CircuitOpenError`` ile hemen düşer,
+- ``background_requests`` bloğundaki (ön çekme) istekler kovada kullanıcı
+  istekleri için pay bırakır; jeton yetmezse beklemeden ``DeferredError``
+  ile düşer.
+
+Adresler ortam değişkenleriyle değiştirilebilir; böylece istemci yerel bir
+sahte HTTP sunucusuna karşı denenebilir.
+"""
+import os
+import random
+from contextlib import contextmanager
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# API bazında ayarlar: temel adres, saniyedeki istek hızı ve ani istek payı
+API_CONFIGS = {
+    "gbif": {
+        "base_url": os.environ.get("ISTILACI_GBIF_URL", "https://api.gbif.org/v1"),
+        "rate": 10.0,
+        "burst": 20,
+    },
+    "inaturalist": {
+        "base_url": os.environ.get("ISTILACI_INATURALIST_URL", "https://api.inaturalist.org/v1"),
+        "rate": 1.0,
+        "burst": 5,
+    },
+    "semantic_scholar": {
+        "base_url": os.environ.get(
+            "ISTILACI_SEMANTIC_SCHOLAR_URL", "https://api.semanticscholar.org/graph/v1"
+        ),
+        "rate": 1.0,
+        "burst": 1,
+        "headers": (
+            {"x-api-key": os.environ["SEMANTIC_SCHOLAR_API_KEY"]}
+            if os.environ.get("SEMANTIC_SCHOLAR_API_KEY") else {}
+        ),
+    },
+    # İl sınırları GeoJSON'u; adres verilmezse uzaktan yüklenmez
+    "province_boundaries": {
+        "base_url": os.environ.get("ISTILACI_PROVINCE_GEOJSON_URL", ""),
+        "rate": 1.0,
+        "burst": 1,
+    },
+}
+
+# (bağlantı, okuma) zaman aşımları, saniye
+DEFAULT_TIMEOUT = (3.05, 10)
+POOL_SIZE = 16
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class HttpError(Exception):
+    """İstemcinin fırlattığı tüm hataların temel sınıfı"""
+
+
+class UpstreamError(HttpError):
+    """Yeniden denemelere rağmen API'den geçerli yanıt alınamadı"""
+
+
+class CircuitOpenError(HttpError):
+    """API devre dışı; istek gönderilmeden düşürüldü"""
+
+
+class DeferredError(HttpError):
+    """Arka plan isteği, kovada kullanıcı istekleri için pay kalsın diye gönderilmedi"""
+
+
+class TokenBucket:
+    """Saniyede ``rate`` jeton dolan, en fazla ``capacity`` jeton tutan kova"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Bir jeton alınana kadar bekler"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, reserve=0):
+        """Jeton aldıktan sonra kovada en az ``reserve`` jeton kalacaksa alır.
+
+        Beklemez; jeton alınamazsa ``False`` döner.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens - 1 >= reserve:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """Art arda ``failure_threshold`` hatadan sonra ``reset_timeout`` saniye açık kalır.
+
+    Süre dolunca tek bir deneme isteğine izin verilir (yarı açık); başarılı
+    olursa devre kapanır, başarısız olursa yeniden açılır.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """"closed", "open" veya "half-open" döner"""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """İstek gönderilebilir mi?"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class ApiClient:
+    """Tek bir API'ye havuzlu, hız sınırlı ve yeniden denemeli JSON istemcisi"""
+
+    def __init__(self, name, base_url, rate, burst, headers=None, timeout=DEFAULT_TIMEOUT,
+                 retries=2, backoff=0.5, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _sleep_before_retry(self, attempt, response=None):
+        """Üstel geri çekilme (rastgele sapmalı); varsa Retry-After başlığına uyar"""
+        delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def get_json(self, path, params=None, timeout=None):
+        """``base_url + path`` adresine GET yapar ve JSON gövdesini döner.
+
+        ``path`` boşsa doğrudan ``base_url`` istenir.
+        """
+        reserve = getattr(_background, "reserve", None)
+        if reserve is not None and not self.bucket.try_acquire(reserve * self.bucket.capacity):
+            raise DeferredError(f"{self.name}: arka plan isteği ertelendi")
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} geçici olarak devre dışı")
+
+        url = f"{self.base_url}/{path.lstrip('/')}" if path else self.base_url
+        error = None
+        response = None
+        recorded = False
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self._sleep_before_retry(attempt - 1, response)
+                response = None
+                if attempt or reserve is None:
+                    self.bucket.acquire()
+                try:
+                    response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+                except requests.RequestException as e:
+                    error = e
+                    continue
+
+                if response.status_code in RETRYABLE_STATUS:
+                    error = UpstreamError(f"{self.name}: HTTP {response.status_code}")
+                    continue
+                if response.status_code >= 400:
+                    # İstemci hatası; API ayakta olduğundan devre sayacına yansımaz
+                    self.breaker.record_success()
+                    recorded = True
+                    raise HttpError(f"{self.name}: HTTP {response.status_code}")
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    error = e
+                    continue
+                self.breaker.record_success()
+                recorded = True
+                return data
+            raise UpstreamError(f"{self.name}: {error}") from error
+        finally:
+            # Beklenmeyen bir hata da dahil, sonucu kaydedilmemiş her istek
+            # başarısız sayılır; yarı açık devrenin deneme isteği askıda kalmaz
+            if not recorded:
+                self.breaker.record_failure()
+
+
+_background = threading.local()
+
+
+@contextmanager
+def background_requests(reserve):
+    """Bloktaki istekleri bu iş parçacığında düşük öncelikli yapar.
+
+    Her API'nin kovasının ``reserve`` oranı (0–1) kullanıcı isteklerine
+    bırakılır; bu paya dokunmadan jeton alınamazsa istek beklemeden
+    ``DeferredError`` ile düşer.
+    """
+    previous = getattr(_background, "reserve", None)
+    _background.reserve = reserve
+    try:
+        yield
+    finally:
+        _background.reserve = previous
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """API adına göre süreç genelinde paylaşılan istemciyi döner"""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = ApiClient(name, **API_CONFIGS[name])
+        return _clients[name]
@@ -0,0 +1,74 @@
+"""Çizilmiş harita HTML'leri için bellek içi LRU önbellek.
+
+Aynı tür, katman seçimi ve veri kümesi için folium haritası her seferinde
+aynı HTML'i üretir. Önbellek bu HTML'i süreç genelinde saklar; tekrar
+görüntülemelerde ve popüler türlere gelen çok kullanıcılı trafikte harita
+kurulumu ve serileştirmesi tamamen atlanır. Toplam boyut sınırı aşılınca en
+uzun süredir kullanılmayan haritalar atılır.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+MAP_CACHE_MAX_BYTES = int(float(os.environ.get("ISTILACI_MAP_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class MapCache:
+    """Anahtar → HTML eşlemesi; boyut sınırlı, en uzun süredir okunmayan önce atılır"""
+
+    def __init__(self, max_bytes=MAP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Saklı HTML'i döner, yoksa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, html):
+        """HTML'i saklar; sınırdan büyük tek bir harita saklanmaz"""
+        size = len(html.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (html, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def stats(self):
+        """Kayıt sayısı, toplam boyut ve isabet/ıska sayılarını döner"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_map_cache():
+    """Süreç genelinde paylaşılan harita önbelleğini döner"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = MapCache()
+        return _default_cache
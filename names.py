@@ -0,0 +1,104 @@
+"""Bilimsel adları API sorgularında kullanılacak kanonik biçime çeviren ayrıştırıcı.
+
+Listedeki adlar yazar ve yıl bilgisi taşır ("Acalypha australis L.",
+"Alepes djedaba (Forsskål, 1775)", "Sicyos angulatusL."). Kanonik biçim
+yalnızca cins, tür sıfatı ve varsa alttür/varyete sıfatından oluşur:
+
+- yazarlar, yıllar ve alt cins parantezleri atılır,
+- "var.", "f.", "subsp." gibi rütbe kısaltmaları atılır, sıfat kalır (tür
+  yazarı rütbeden önce gelse de: "Xanthium strumarium L. subsp. italicum"),
+- melez işaretleri ("×", "x") ve "cf.", "aff." belirsizlik ekleri atılır,
+- "sp."/"spp." gibi tür sıfatı olmayan adlar cins adına indirgenir.
+
+Veri yüklenirken tüm ``Tür`` sütunu tek seferde çözülüp süreç geneli bir
+eşlemeye kaydedilir (``register``); API yardımcıları bu adlar için hazır
+sonucu kullanır. Kayıtlı olmayan adlar sınırlı bir LRU önbelleğiyle çözülür.
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+_EPITHET = r"[a-zäëïöüé][a-zäëïöüé-]+"
+_RANK = r"(?:var|f|fo|subsp|ssp|forma|cv)\."
+# Tür yazarı: büyük harfle başlayan adlar/kısaltmalar, parantezli yazarlar,
+# yıllar ve bağlaçlar ("L.", "(Moretti) D.Löve", "Bojer ex Sims", "1775")
+_AUTHORITY = (
+    r"(?:\s+(?:\([^()]*\)\S*|[A-ZÀ-ÖØ-Þ]\S*|\d{4}\)?,?|&|ex|et|in|de|da|von|van|der))+"
+)
+# Cins (önünde melez işareti olabilir), isteğe bağlı alt cins, melez ya da
+# belirsizlik eki, tür sıfatı ve isteğe bağlı alttür/varyete sıfatı. Rütbeli
+# sıfatın önünde tür yazarı olabilir (üçüncü grup), rütbesiz sıfat doğrudan
+# tür sıfatını izler (dördüncü grup).
+NAME_PATTERN = re.compile(
+    r"(?<![\w.])(?:×\s?)?([A-Z][a-zäëïöüé-]+)"
+    r"(?:\s+\([A-Z][a-z]+\))?"
+    r"\s+(?:×\s*|x\s+)?(?:(?:cf|aff)\.\s*)?(" + _EPITHET + r")"
+    r"(?:(?:" + _AUTHORITY + r")?\s+" + _RANK + r"\s*(?:×\s*|x\s+)?(" + _EPITHET + r")"
+    r"|\s+(?:×\s*|x\s+)?(" + _EPITHET + r"))?"
+)
+_GENUS = re.compile(r"(?<![\w.])(?:×\s?)?([A-Z][a-zäëïöüé-]+)")
+# Yazar adlarında ya da belirsiz adlarda sıfat sanılabilecek küçük harfli sözcükler
+NOT_EPITHETS = {
+    'von', 'van', 'der', 'den', 'del', 'della', 'delle', 'dei', 'des', 'les',
+    'de', 'du', 'da', 'di', 'la', 'le', 'ex', 'et', 'in', 'and', 'non', 'nom',
+    'sensu', 'auct', 'emend', 'nec', 'not', 'sp', 'spp', 'var', 'subsp', 'ssp',
+}
+
+
+def scientific_names(text):
+    """Metindeki bilimsel adları kanonik biçimde (sırayla, tekrarsız) döner"""
+    names = []
+    for genus, species, ranked, unranked in NAME_PATTERN.findall(str(text)):
+        infra = ranked or unranked
+        if species in NOT_EPITHETS:
+            continue
+        parts = [genus, species]
+        if infra and infra not in NOT_EPITHETS:
+            parts.append(infra)
+        name = " ".join(parts)
+        if name not in names:
+            names.append(name)
+    return names
+
+
+# Yüklenmiş veri kümelerinin ad → kanonik ad eşlemesi; LRU önbelleğinden
+# farklı olarak kayıtlar atılmaz
+_registry = {}
+
+
+def register(mapping):
+    """Ad → kanonik ad eşlemesini API yardımcılarının göreceği kayda ekler"""
+    _registry.update(mapping)
+
+
+def canonical_name(name):
+    """Adın kanonik biçimini döner; tür sıfatı yoksa cins adını döner.
+
+    >>> canonical_name("Xanthium strumarium L. subsp. italicum (Moretti) D.Löve")
+    'Xanthium strumarium italicum'
+    >>> canonical_name("Alepes djedaba (Forsskål, 1775)")
+    'Alepes djedaba'
+    """
+    try:
+        return _registry[name]
+    except (KeyError, TypeError):
+        return _parse_name(name)
+
+
+@lru_cache(maxsize=65536)
+def _parse_name(name):
+    """Kayıtlı olmayan adları ayrıştırır"""
+    text = str(name).strip().strip('"\'')
+    found = scientific_names(text)
+    if found:
+        return found[0]
+    genus = _GENUS.match(text)
+    return genus.group(1) if genus else text
+
+
+def canonical_names(names):
+    """Bir ad dizisini her farklı adı bir kez çözerek kanonik adlara çevirir"""
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+    resolved = pd.Series([canonical_name(name) for name in uniques], dtype=object)
+    return resolved.to_numpy()[codes]
@@ -0,0 +1,168 @@
+"""Haritada kullanılan bölge tanımları ve vektörel nokta-çokgen içi testi.
+
+Her bölge, sunucu tarafında uygulanacak GBIF ve iNaturalist filtrelerini ve
+filtrelerden sızan kayıtları ayıklamak için kaba bir sınır çokgenini tutar.
+İl sınırları (tür zenginliği haritası için) depoda yoktur; yapılandırılırsa
+bir GeoJSON dosyasından ya da adresinden arka planda yüklenir.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from gazetteer import normalize_name
+from http_client import get_client
+
+# Türkiye sınırı (boylam, enlem). Deniz türlerinin kayıtları düşmesin diye
+# kıyı sularını da içine alan kaba bir çizgidir; yakın Yunan adalarının bir
+# kısmı çokgenin içinde kalır.
+TURKEY_POLYGON = [
+    (25.55, 40.05), (25.85, 40.75), (26.35, 40.95), (26.60, 41.65), (26.35, 41.75),
+    (26.60, 41.97), (27.60, 42.05), (28.10, 42.05), (29.00, 41.45), (31.00, 41.35),
+    (32.40, 41.90), (33.50, 42.10), (35.10, 42.25), (36.40, 41.55), (37.80, 41.20),
+    (39.70, 41.20), (41.50, 41.60), (42.80, 41.60), (43.50, 41.20), (43.70, 40.70),
+    (44.80, 39.75), (44.40, 39.30), (44.30, 38.30), (44.80, 37.20), (42.40, 37.10),
+    (40.50, 37.05), (38.00, 36.68), (37.10, 36.60), (36.70, 36.80), (36.60, 36.20),
+    (36.20, 35.75), (35.70, 35.80), (35.20, 36.40), (34.00, 36.10), (32.80, 35.90),
+    (31.50, 36.35), (30.60, 36.10), (29.50, 36.00), (28.30, 36.60), (27.40, 36.60),
+    (27.10, 37.00), (27.00, 37.70), (26.20, 38.25), (26.30, 38.75), (26.55, 39.35),
+    (25.90, 39.80),
+]
+
+REGIONS = {
+    "turkey": {
+        "label": "🇹🇷 Yalnızca Türkiye",
+        "gbif": {"country": "TR"},
+        "inaturalist": {"swlat": 35.75, "swlng": 25.55, "nelat": 42.25, "nelng": 44.80},
+        "polygon": TURKEY_POLYGON,
+    },
+}
+
+
+def points_in_polygon(lats, lons, polygon):
+    """Noktaların çokgen içinde olup olmadığını ışın atma yöntemiyle bulur.
+
+    Döngü çokgenin kenarları üzerindedir; her kenar tüm noktalara tek bir
+    NumPy işlemiyle uygulanır. Dönen değer noktalarla aynı boyda bir
+    boolean dizidir.
+    """
+    y = np.asarray(lats, dtype=float)
+    x = np.asarray(lons, dtype=float)
+    poly = np.asarray(polygon, dtype=float)
+    px, py = poly[:, 0], poly[:, 1]
+
+    inside = np.zeros(x.shape, dtype=bool)
+    # Çokgeni çevreleyen dikdörtgenin dışındakiler hiç test edilmez
+    candidate = (x >= px.min()) & (x <= px.max()) & (y >= py.min()) & (y <= py.max())
+    if not candidate.any():
+        return inside
+    cx, cy = x[candidate], y[candidate]
+    hit = np.zeros(cx.shape, dtype=bool)
+    for x1, y1, x2, y2 in zip(px, py, np.roll(px, -1), np.roll(py, -1)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > cy) != (y2 > cy)
+        x_cross = x1 + (cy - y1) * (x2 - x1) / (y2 - y1)
+        hit ^= crosses & (cx < x_cross)
+    inside[candidate] = hit
+    return inside
+
+
+def filter_to_region(records, region, lat_key='lat', lon_key='lon'):
+    """Koordinatı bölge çokgeninin dışında kalan kayıtları atar"""
+    if not region or not records:
+        return records
+    lats = [rec[lat_key] for rec in records]
+    lons = [rec[lon_key] for rec in records]
+    mask = points_in_polygon(lats, lons, REGIONS[region]["polygon"])
+    return [rec for rec, keep in zip(records, mask) if keep]
+
+
+# İl sınırları: ISTILACI_PROVINCE_GEOJSON ile verilen GeoJSON dosyası ya da
+# ISTILACI_PROVINCE_GEOJSON_URL ile verilen uzak adres; ikisi de yoksa iller
+# merkezlerinde dairelerle çizilir. İl adı PROVINCE_NAME_FIELD özelliğinden
+# okunur.
+PROVINCE_BOUNDARIES_FILE = os.environ.get("ISTILACI_PROVINCE_GEOJSON", "")
+PROVINCE_NAME_FIELD = os.environ.get("ISTILACI_PROVINCE_NAME_FIELD", "name")
+# Koordinatların yuvarlandığı ondalık basamak (2 ≈ 1 km); her harita HTML'ine
+# gömülen çokgenleri küçültür
+PROVINCE_PRECISION = int(os.environ.get("ISTILACI_PROVINCE_PRECISION", "2"))
+
+
+def simplify_ring(ring, precision=PROVINCE_PRECISION):
+    """Halkanın koordinatlarını yuvarlar ve art arda yinelenen köşeleri atar.
+
+    Kapalı bir halka için en az dört köşe kalır; sadeleştirme halkayı
+    bozacaksa yalnızca yuvarlanmış hali döner.
+    """
+    coords = np.round(np.asarray(ring, dtype=float)[:, :2], precision)
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    simplified = coords[keep]
+    if len(simplified) < 4:
+        simplified = coords
+    return simplified.tolist()
+
+
+def simplify_geometry(geometry, precision=PROVINCE_PRECISION):
+    """Polygon/MultiPolygon geometrisini ``simplify_ring`` ile sadeleştirir"""
+    if geometry['type'] == 'Polygon':
+        rings = [simplify_ring(ring, precision) for ring in geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        rings = [[simplify_ring(ring, precision) for ring in polygon] for polygon in geometry['coordinates']]
+    else:
+        return geometry
+    return {"type": geometry['type'], "coordinates": rings}
+
+
+def load_province_boundaries(provinces, source=PROVINCE_BOUNDARIES_FILE, name_field=PROVINCE_NAME_FIELD):
+    """İl sınırlarını sadeleştirilmiş {il: geometri} olarak yükler.
+
+    Uzak adres yapılandırıldıysa GeoJSON ``http_client`` üzerinden, yoksa
+    ``source`` dosyasından okunur; ikisi de verilmediyse boş sözlük döner. Kaynaktaki
+    adlar normalleştirilerek ``provinces`` içindeki adlarla eşlenir; eşleşmeyen
+    çokgenler atılır. Kaynak okunamazsa ``OSError``, ``ValueError`` ya da
+    ``HttpError`` yükselir.
+    """
+    client = get_client("province_boundaries")
+    if client.base_url:
+        data = client.get_json("")
+    elif source:
+        with open(source, encoding='utf-8') as fh:
+            data = json.load(fh)
+    else:
+        return {}
+    by_key = {normalize_name(name): name for name in provinces}
+    boundaries = {}
+    for feature in data.get('features', []):
+        name = by_key.get(normalize_name((feature.get('properties') or {}).get(name_field, '')))
+        if name and feature.get('geometry'):
+            boundaries[name] = simplify_geometry(feature['geometry'])
+    return boundaries
+
+
+class ProvinceBoundaries:
+    """İl sınırlarını arka planda bir kez yükler.
+
+    ``get`` beklemez: yükleme sürerken ``None`` döner. Başarısız yükleme
+    saklanmaz; sonraki ``get`` yeniden dener (uzak kaynakta devre kesici
+    tekrarları sınırlar).
+    """
+
+    def __init__(self, provinces):
+        self.provinces = list(provinces)
+        self._lock = threading.Lock()
+        self._future = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="il-sinirlari")
+
+    def get(self):
+        """Yüklendiyse {il: geometri} (boş olabilir), değilse ``None``"""
+        with self._lock:
+            future = self._future
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._future = self._executor.submit(load_province_boundaries, self.provinces)
+        if not future.done() or future.exception() is not None:
+            return None
+        return future.result()
@@ -0,0 +1,118 @@
+"""Tür metinlerinde BM25 sıralamalı tam metin arama.
+
+Veri kümesi başına bir kez ters dizin kurulur: her kök için geçtiği
+belgeler ve BM25 ağırlıkları diziler halinde saklanır. Ağırlıklar sorgudan
+bağımsız olduğundan kurulumda hesaplanır; arama yalnızca sorgudaki köklerin
+listelerini toplar, hiçbir metin hücresi yeniden taranmaz.
+
+Metinler gazeteer ile aynı kurallarla normalleştirilir (Türkçe İ/ı
+küçültmesi, aksanların atılması); ardından sık görülen çekim ekleri basit
+bir kural listesiyle kırpılır ("ormanlarda" → "orman").
+"""
+import bisect
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from gazetteer import normalize_name
+
+# Aksanları atılmış halleriyle, uzundan kısaya denenen ekler
+SUFFIXES = sorted({
+    "lerinden", "larindan", "lerinde", "larinda", "lerine", "larina", "lerini", "larini",
+    "lerin", "larin", "leri", "lari", "ler", "lar",
+    "inden", "indan", "unden", "undan", "inde", "inda", "unde", "unda",
+    "nden", "ndan", "nde", "nda", "nin", "nun", "yla", "yle", "ile",
+    "den", "dan", "ten", "tan", "de", "da", "te", "ta",
+    "in", "un", "si", "su", "yi", "yu", "ye", "ya",
+}, key=len, reverse=True)
+MIN_STEM = 4
+# Yazarken aranan son sözcüğün önek olarak genişletileceği en fazla kök
+MAX_PREFIX_TERMS = 50
+
+
+@lru_cache(maxsize=100_000)
+def stem(token):
+    """Sözcüğün sonundaki çekim eklerini (en fazla iki kez) kırpar"""
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def tokenize(text):
+    """Metni normalleştirilmiş köklerin listesine çevirir"""
+    return [stem(token) for token in normalize_name(text).split() if len(token) > 1]
+
+
+class SearchIndex:
+    """Belge anahtarlarını BM25 puanıyla sıralayan ters dizin"""
+
+    def __init__(self, keys, documents, k1=1.5, b=0.75):
+        self.keys = list(keys)
+        doc_ids = defaultdict(list)
+        freqs = defaultdict(list)
+        lengths = np.zeros(len(self.keys), dtype=np.float32)
+        for doc, text in enumerate(documents):
+            terms = tokenize(text)
+            lengths[doc] = len(terms)
+            for term, count in Counter(terms).items():
+                doc_ids[term].append(doc)
+                freqs[term].append(count)
+
+        n_docs = max(len(self.keys), 1)
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        self.postings = {}
+        for term, docs in doc_ids.items():
+            docs = np.asarray(docs, dtype=np.int32)
+            tf = np.asarray(freqs[term], dtype=np.float32)
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[term] = (docs, idf * tf * (k1 + 1) / (tf + norm[docs]))
+        self.terms = sorted(self.postings)
+
+    def _expand(self, term):
+        """Sözlükte olmayan kökü önek olarak genişletir"""
+        if term in self.postings:
+            return [term]
+        start = bisect.bisect_left(self.terms, term)
+        matches = []
+        for candidate in self.terms[start:start + MAX_PREFIX_TERMS]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, limit=50, mask=None):
+        """Sorguya en uygun belgeleri [(anahtar, puan), ...] olarak döner.
+
+        ``mask`` verilirse yalnızca True olan belgeler (ör. filtrelere uyan
+        satırlar) sonuçlara girer.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+        for i, term in enumerate(tokens):
+            # Yalnızca son sözcük yazılmakta olabilir; öncekiler tam aranır
+            for match in (self._expand(term) if i == len(tokens) - 1 else [term]):
+                if match in self.postings:
+                    docs, weights = self.postings[match]
+                    scores[docs] += weights
+        if mask is not None:
+            scores[~mask] = 0
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(scores[hits], -limit)[-limit:]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+
+        results, seen = [], set()
+        for doc in hits:
+            key = self.keys[doc]
+            if key not in seen:
+                seen.add(key)
+                results.append((key, float(scores[doc])))
+        return results
@@ -0,0 +1,245 @@
+"""GBIF, iNaturalist ve Semantic Scholar'dan tür verisi çeken yardımcılar.
+
+Bu modül Streamlit'e bağlı değildir; hem uygulama (``app_yeni.py``, süreç
+içi ``st.cache_data`` katmanıyla) hem de toplu zenginleştirme işi
+(``enrich_all.py``) aynı fonksiyonları kullanır. Yanıtlar ``api_cache``
+üzerinden kalıcı olarak önbelleğe alınır.
+
+Toplu işin ürettiği yan dosya (``PRECOMPUTED_PATH``) yüklendiyse tür kaydı
+ve makaleler önce oradan okunur; ağa yalnızca dosyada olmayan türler için
+gidilir.
+"""
+import json
+import os
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+from api_cache import cached_response
+from http_client import get_client
+from names import canonical_name
+from regions import REGIONS, filter_to_region, points_in_polygon
+from synonyms import synonyms_for
+
+# GBIF sayfa boyutu (API'nin izin verdiği en büyük değer); çözümleyici ve harita
+# aynı önbellek kayıtlarını paylaşsın diye sayfalar her yerde bu boyutla istenir
+GBIF_PAGE_LIMIT = 300
+# Bir tür için haritaya alınacak varsayılan ve mutlak en fazla GBIF kaydı
+# (GBIF sayfalamayı offset + limit <= 100.000 ile sınırlar)
+GBIF_MAX_RECORDS = 3000
+GBIF_OFFSET_CAP = 100000
+# Haritada tutulan kayıt alanları
+GBIF_FIELDS = ('lat', 'lon', 'year', 'country', 'basisOfRecord')
+# Kabul edilen ad eşleşmediğinde denenecek en fazla sinonim sayısı
+MAX_SYNONYM_TRIES = 5
+
+# Toplu işin yazdığı, uygulamanın açılışta okuduğu yan dosya (JSON Lines)
+PRECOMPUTED_PATH = os.environ.get(
+    "ISTILACI_ENRICHMENT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "enrichment.jsonl"),
+)
+
+_precomputed = {}
+_precomputed_lock = threading.Lock()
+
+
+def read_precomputed(path=PRECOMPUTED_PATH):
+    """Yan dosyayı {tür: kayıt} olarak okur.
+
+    Her satır bir türdür; aynı tür birden çok kez yazılmışsa son satır
+    geçerlidir. Yarıda kesilmiş bir çalışmanın bozuk son satırı atlanır.
+    """
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get('name'):
+                entries[entry['name']] = entry
+    return entries
+
+
+def load_precomputed(path=PRECOMPUTED_PATH):
+    """Yan dosyayı yardımcıların kullanacağı şekilde yükler; tür sayısını döner"""
+    entries = read_precomputed(path)
+    with _precomputed_lock:
+        _precomputed.clear()
+        _precomputed.update(entries)
+    return len(entries)
+
+
+def _slim_occurrence(rec):
+    """GBIF kaydından yalnızca haritanın kullandığı alanları alır"""
+    return {
+        'lat': rec['decimalLatitude'],
+        'lon': rec['decimalLongitude'],
+        'year': rec.get('year'),
+        'country': rec.get('country'),
+        'basisOfRecord': rec.get('basisOfRecord'),
+    }
+
+
+def _first_image_url(occurrences):
+    """Kayıtların medya listelerinden ilk fotoğraf adresini döner"""
+    for rec in occurrences:
+        for media in rec.get('media', []):
+            if media.get('type') == 'StillImage' and media.get('identifier'):
+                return media['identifier']
+    return None
+
+
+@cached_response("gbif")
+def get_gbif_occurrence_page(usage_key, offset=0, region=None):
+    """GBIF'ten koordinatlı kayıtların bir sayfasını sade alanlarla çeker.
+
+    Dönen sözlük sayfanın kayıtlarını, API'nin döndürdüğü (süzülmeden önceki)
+    kayıt sayısını, toplam kayıt sayısını, son sayfa bilgisini ve sayfadaki
+    ilk fotoğraf adresini içerir. Bölge verilirse
+    ülke filtresi isteğe eklenir, sınır dışında kalanlar ayrıca ayıklanır.
+    """
+    params = {"taxonKey": usage_key, "offset": offset, "limit": GBIF_PAGE_LIMIT, "hasCoordinate": "true"}
+    if region:
+        params.update(REGIONS[region]["gbif"])
+    page = get_client("gbif").get_json("occurrence/search", params=params)
+    results = page.get('results', [])
+    records = [
+        _slim_occurrence(rec) for rec in results
+        if 'decimalLatitude' in rec and 'decimalLongitude' in rec
+    ]
+    return {
+        'count': page.get('count', 0),
+        'endOfRecords': page.get('endOfRecords', True),
+        'records': filter_to_region(records, region),
+        'fetched': len(results),
+        'image_url': _first_image_url(results),
+    }
+
+
+def resolve_species(species_name):
+    """Tür kaydını önce yan dosyadan, yoksa uzak API'lerden döner"""
+    entry = _precomputed.get(species_name)
+    if entry and entry.get('species'):
+        return entry['species']
+    return fetch_species_record(species_name)
+
+
+@cached_response("species")
+def fetch_species_record(species_name):
+    """Tür adını tüm yardımcıların kullandığı çözümlenmiş kayda dönüştürür.
+
+    Kayıt GBIF kullanım anahtarı, iNaturalist takson kimliği, kanonik ad,
+    fotoğraf adresi ve koordinatlı kayıt sayısını içerir. Ad GBIF'te ya da
+    iNaturalist'te bulunamazsa Sinonim sütunundaki adlar denenir. Fotoğraf, GBIF
+    kayıtlarının ilk sayfasındaki medyadan alınır; o sayfa da önbellekte
+    kaldığından harita için yeniden istenmez. Ağ hatasında istisna fırlatılır,
+    (``HttpError``) böylece eksik kayıt önbelleğe yazılmaz.
+    """
+    clean_name = canonical_name(species_name)
+    record = {
+        'name': species_name,
+        'canonical_name': clean_name,
+        'usage_key': None,
+        'inat_taxon_id': None,
+        'image_url': None,
+        'occurrence_count': 0,
+    }
+
+    # Kabul edilen ad eşleşmezse (ya da yalnızca cins düzeyinde eşleşirse)
+    # veri kümesindeki sinonimler sırayla denenir
+    candidates = [clean_name] + synonyms_for(species_name)[:MAX_SYNONYM_TRIES]
+    fallback = None
+    for name in candidates:
+        match = get_client("gbif").get_json("species/match", params={"name": name})
+        fallback = fallback or match
+        if match.get('usageKey') and match.get('matchType') not in ('NONE', 'HIGHERRANK'):
+            break
+    else:
+        match = fallback
+    # Sinonim eşleşmesinde kabul edilen taksonun anahtarı kullanılır
+    record['usage_key'] = match.get('acceptedUsageKey') or match.get('usageKey')
+    record['canonical_name'] = match.get('canonicalName') or clean_name
+
+    if record['usage_key']:
+        page = get_gbif_occurrence_page(record['usage_key'], 0)
+        record['occurrence_count'] = page['count']
+        record['image_url'] = page['image_url']
+        if not record['image_url']:
+            # İlk sayfada medya yoksa yalnızca fotoğraflı kayıtlara bak
+            results = get_client("gbif").get_json(
+                "occurrence/search",
+                params={"taxonKey": record['usage_key'], "mediaType": "StillImage", "limit": 1}
+            ).get('results', [])
+            record['image_url'] = _first_image_url(results)
+
+    for name in candidates:
+        search_data = get_client("inaturalist").get_json(
+            "taxa", params={"q": name, "rank": "species"}
+        )
+        if search_data.get('results'):
+            record['inat_taxon_id'] = search_data['results'][0]['id']
+            break
+
+    return record
+
+
+def parse_inat_locations(observations):
+    """iNaturalist'in "enlem,boylam" konum metinlerini toplu olarak iki diziye çevirir.
+
+    Konumu olmayan ya da çözülemeyen gözlemler NaN olur.
+    """
+    coords = pd.Series([obs.get('location') or '' for obs in observations], dtype=object)
+    coords = coords.str.split(',', n=1, expand=True).reindex(columns=[0, 1])
+    lats = pd.to_numeric(coords[0], errors='coerce').to_numpy(dtype=float)
+    lons = pd.to_numeric(coords[1], errors='coerce').to_numpy(dtype=float)
+    return lats, lons
+
+
+@cached_response("inaturalist")
+def get_inaturalist_observations(taxon_id, limit=200, region=None):
+    """iNaturalist'ten taksonun konumlu gözlemlerini çeker"""
+    params = {"taxon_id": taxon_id, "per_page": limit, "has[]": "geo"}
+    if region:
+        params.update(REGIONS[region]["inaturalist"])
+    results = get_client("inaturalist").get_json("observations", params=params).get('results', [])
+    if region:
+        # Dikdörtgen sorgudan taşan komşu ülke gözlemlerini ayıkla
+        lats, lons = parse_inat_locations(results)
+        mask = points_in_polygon(lats, lons, REGIONS[region]["polygon"])
+        results = [obs for obs, keep in zip(results, mask) if keep]
+    return results
+
+
+def get_scientific_papers_semantic(species_name, limit=10):
+    """Makaleleri önce yan dosyadan, yoksa Semantic Scholar'dan döner.
+
+    Ağ hatası ``HttpError`` olarak yükselir; çağıranın önbelleği (ör.
+    ``st.cache_data``) hatayı saklamaz, sonraki çağrı yeniden dener.
+    """
+    entry = _precomputed.get(species_name)
+    if entry and entry.get('papers_limit', 0) >= limit:
+        return entry['papers'][:limit]
+    return fetch_papers(species_name, limit)
+
+
+@cached_response("semantic_scholar")
+def fetch_papers(species_name, limit=10):
+    """Semantic Scholar API ile makaleleri çeker; ağ hatasında ``HttpError`` yükselir"""
+    clean_name = canonical_name(species_name)
+    params = {
+        "query": f"{clean_name} invasive species",
+        "limit": limit,
+        "fields": "title,url,year,venue,abstract,authors,citationCount"
+    }
+    return get_client("semantic_scholar").get_json("paper/search", params=params).get('data', [])
+
+
+def create_google_scholar_link(species_name):
+    """Google Scholar arama linki oluşturur"""
+    clean_name = canonical_name(species_name)
+    query = quote(f"{clean_name} invasive species")
+    return f"https://scholar.google.com/scholar?q={query}"
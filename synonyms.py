@@ -0,0 +1,83 @@
+"""Sinonim sütunundan sinonim adı → kabul edilen tür dizini.
+
+Sinonim hücreleri serbest biçimlidir: virgülle ayrılmış, yazar adlı uzun
+listeler ("Acalypha chinensis Roxb., Acalypha australis var. lanceolata
+Hayata, ...") ya da tırnak içinde boşlukla dizilmiş adlar olabilir; "-" veya
+"Monotipik." gibi değerler sinonim taşımaz. Adlar ``names`` modülündeki
+kalıpla kanonik biçimde ayıklanır; yazar ve yıl bilgileri atılır.
+
+Dizin iki iş görür: yan paneldeki ad aramasında sinonimle yazılan türleri
+bulur, GBIF/iNaturalist kabul edilen adı eşleştiremediğinde de denenecek
+alternatif adları verir.
+"""
+import bisect
+
+from gazetteer import normalize_name
+from names import canonical_name, scientific_names
+
+
+class SynonymIndex:
+    """Normalleştirilmiş ad → kabul edilen tür eşlemesi"""
+
+    def __init__(self, accepted_names, synonym_texts):
+        self.names = {}
+        self.labels = {}
+        self.synonyms = {}
+        for accepted, text in zip(accepted_names, synonym_texts):
+            own = canonical_name(accepted)
+            own_key = normalize_name(own)
+            if own_key:
+                self._add(own_key, own, accepted)
+            found = []
+            for name in scientific_names(text):
+                key = normalize_name(name)
+                if key != own_key:
+                    found.append(name)
+                    self._add(key, name, accepted)
+            self.synonyms.setdefault(accepted, found)
+        self._keys = sorted(self.names)
+
+    def _add(self, key, label, accepted):
+        # Aynı ad birden çok türde geçerse ilk tür kullanılır
+        if key not in self.names:
+            self.names[key] = accepted
+            self.labels[key] = label
+
+    def accepted_name(self, name):
+        """Ad (kabul edilen ya da sinonim) hangi türe aitse onu döner"""
+        return self.names.get(normalize_name(name))
+
+    def synonyms_of(self, accepted):
+        """Kabul edilen türün sinonim adlarını döner"""
+        return self.synonyms.get(accepted, [])
+
+    def search(self, query, limit=20):
+        """Adı sorguyla başlayan türleri [(tür, eşleşen ad), ...] olarak döner"""
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        start = bisect.bisect_left(self._keys, prefix)
+        for key in self._keys[start:]:
+            if not key.startswith(prefix) or len(results) >= limit:
+                break
+            accepted = self.names[key]
+            if accepted not in seen:
+                seen.add(accepted)
+                results.append((accepted, self.labels[key]))
+        return results
+
+
+# Yüklenmiş veri kümelerinden derlenen süreç geneli tür → sinonimler eşlemesi;
+# API yardımcıları tür adından sinonimlere buradan ulaşır
+_registry = {}
+
+
+def register(index):
+    """Dizindeki sinonimleri API yardımcılarının göreceği eşlemeye ekler"""
+    _registry.update(index.synonyms)
+
+
+def synonyms_for(species_name):
+    """Kayıtlı veri kümelerinde türün sinonimlerini döner"""
+    return _registry.get(species_name, [])
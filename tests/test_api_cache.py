@@ -0,0 +1,69 @@
+"""``api_cache`` kalıcı önbelleğinin testleri."""
+import time
+
+import pytest
+
+import api_cache
+from api_cache import ResponseCache, cached_response
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(":memory:")
+    monkeypatch.setattr(api_cache, "_default_cache", cache)
+    return cache
+
+
+def test_key_binds_defaults(cache):
+    calls = []
+
+    @cached_response("gbif")
+    def page(usage_key, offset=0, region=None):
+        calls.append((usage_key, offset, region))
+        return {"records": [usage_key]}
+
+    page(5, 0)
+    page(5, 0, None)
+    page(usage_key=5)
+    page(5, region=None, offset=0)
+    assert calls == [(5, 0, None)]
+    page(5, 0, "turkey")
+    assert len(calls) == 2
+
+
+def test_empty_results_are_cached(cache):
+    calls = []
+
+    @cached_response("semantic_scholar")
+    def papers(name):
+        calls.append(name)
+        return []
+
+    assert papers("x") == []
+    assert papers("x") == []
+    assert calls == ["x"]
+
+
+def test_empty_results_expire_sooner(cache, monkeypatch):
+    cache.set("semantic_scholar", "empty", [])
+    cache.set("semantic_scholar", "full", [{"title": "A"}])
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + api_cache.EMPTY_TTL + 1)
+    assert cache.get("semantic_scholar", "empty") == (False, None)
+    assert cache.get("semantic_scholar", "full") == (True, [{"title": "A"}])
+
+
+def test_errors_are_not_cached(cache):
+    calls = []
+
+    @cached_response("inaturalist")
+    def observations(taxon_id):
+        calls.append(taxon_id)
+        if len(calls) == 1:
+            raise RuntimeError("kesinti")
+        return []
+
+    with pytest.raises(RuntimeError):
+        observations(1)
+    assert observations(1) == []
+    assert calls == [1, 1]
@@ -0,0 +1,43 @@
+"""``gazetteer`` yer adı çözümleme testleri."""
+import pandas as pd
+import pytest
+
+from gazetteer import GAZETTEER, LOOKUP_CACHE_SIZE, Gazetteer
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("İzmir ", "İzmir"),
+    ("IZMIR", "İzmir"),
+    ("İskenderun, Hatay", "İskenderun"),
+    ("İskendrun", "İskenderun"),
+    ("Fetiye", "Fethiye"),
+    ("Kemer", "Kemer"),
+])
+def test_lookup(raw, expected):
+    assert GAZETTEER.lookup(raw) == expected
+
+
+def test_fuzzy_requires_whole_name_to_be_covered():
+    # Kemerköy Muğla'dadır; Antalya'daki Kemer'e düşmemeli
+    assert GAZETTEER.lookup("Kemerköy") is None
+
+
+def test_short_candidates_need_higher_similarity():
+    gazetteer = Gazetteer({"Kemer": (36.6, 30.6)})
+    assert gazetteer.lookup("Kemerx") is None
+    assert gazetteer.lookup("Kemer") == "Kemer"
+
+
+def test_lookup_cache_is_bounded():
+    gazetteer = Gazetteer({"Kemer": (36.6, 30.6)})
+    gazetteer.lookup("Kemer")
+    gazetteer.lookup("Kemer")
+    info = gazetteer._cached_resolve.cache_info()
+    assert info.hits == 1
+    assert info.maxsize == LOOKUP_CACHE_SIZE
+
+
+def test_resolve_series():
+    resolved = GAZETTEER.resolve_series(pd.Series(["İzmir", "Kemerköy", "izmir", None]))
+    assert resolved.iloc[0] == resolved.iloc[2] == "İzmir"
+    assert resolved.iloc[1:].isna().tolist() == [True, False, True]
@@ -0,0 +1,286 @@
+"""``http_client.ApiClient``'ın yerel sahte HTTP sunucusuna karşı testleri.
+
+Sunucu her yol için sıradaki yanıtı (durum kodu, başlıklar, gövde) bir
+kuyruktan verir; kuyruk boşalınca 200 ve ``{"ok": true}`` döner. Gelen
+istekler yol bazında sayılır.
+"""
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import (
+    ApiClient, CircuitOpenError, DeferredError, HttpError, TokenBucket, UpstreamError, background_requests,
+)
+
+
+class StubServer:
+    """Yol başına sıralı yanıtlar veren localhost sunucusu"""
+
+    def __init__(self):
+        self.responses = defaultdict(deque)
+        self.hits = defaultdict(int)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                stub.hits[path] += 1
+                queue = stub.responses[path]
+                status, headers, body = queue.popleft() if queue else (200, {}, {"ok": True})
+                data = json.dumps(body).encode() if not isinstance(body, bytes) else body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def queue(self, path, *responses):
+        """``(durum, başlıklar, gövde)`` yanıtlarını yolun kuyruğuna ekler"""
+        self.responses[path].extend(responses)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+def make_client(stub, **kwargs):
+    options = dict(rate=1000.0, burst=1000, retries=2, backoff=0.01, failure_threshold=5, reset_timeout=30.0)
+    options.update(kwargs)
+    return ApiClient("stub", stub.url, **options)
+
+
+def test_returns_json_body(stub):
+    stub.queue("/items", (200, {}, {"results": [1, 2]}))
+    client = make_client(stub)
+    assert client.get_json("items", params={"q": "x"}) == {"results": [1, 2]}
+    assert stub.hits["/items"] == 1
+    assert client.breaker.state == "closed"
+
+
+def test_empty_path_requests_base_url(stub):
+    stub.queue("/geo/iller.json", (200, {}, {"features": []}))
+    client = ApiClient("file", f"{stub.url}/geo/iller.json", rate=1000.0, burst=1000)
+    assert client.get_json("") == {"features": []}
+    assert stub.hits["/geo/iller.json"] == 1
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_retryable_status_then_succeeds(stub, status):
+    stub.queue("/items", (status, {}, {}), (status, {}, {}), (200, {}, {"ok": 1}))
+    client = make_client(stub)
+    assert client.get_json("items") == {"ok": 1}
+    assert stub.hits["/items"] == 3
+
+
+def test_gives_up_after_retries(stub):
+    stub.queue("/items", *[(503, {}, {})] * 3)
+    client = make_client(stub, retries=2)
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    assert stub.hits["/items"] == 3
+
+
+def test_client_error_is_not_retried_and_keeps_breaker_closed(stub):
+    stub.queue("/missing", *[(404, {}, {})] * 10)
+    client = make_client(stub, failure_threshold=1)
+    for _ in range(3):
+        with pytest.raises(HttpError) as info:
+            client.get_json("missing")
+        assert not isinstance(info.value, UpstreamError)
+    assert stub.hits["/missing"] == 3
+    assert client.breaker.state == "closed"
+
+
+def test_invalid_json_is_retried(stub):
+    stub.queue("/items", (200, {}, b"not json"), (200, {}, {"ok": 1}))
+    client = make_client(stub)
+    assert client.get_json("items") == {"ok": 1}
+    assert stub.hits["/items"] == 2
+
+
+def test_retry_after_header_is_honoured(stub):
+    stub.queue("/items", (429, {"Retry-After": "1"}, {}), (200, {}, {"ok": 1}))
+    client = make_client(stub)
+    started = time.monotonic()
+    assert client.get_json("items") == {"ok": 1}
+    assert time.monotonic() - started >= 1.0
+
+
+def test_connection_error_raises_upstream_error():
+    server = StubServer()
+    url = server.url
+    server.close()
+    client = ApiClient("closed", url, rate=1000.0, burst=1000, retries=1, backoff=0.01)
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+
+
+class RaisingSession:
+    """``get`` çağrılarında sıradaki istisnayı fırlatan sahte oturum"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        raise self.errors.pop(0)
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ChunkedEncodingError("kesik gövde"),
+    requests.exceptions.ContentDecodingError("bozuk gzip"),
+    requests.exceptions.TooManyRedirects("döngü"),
+])
+def test_other_request_errors_become_upstream_error(error):
+    client = ApiClient("raising", "http://127.0.0.1:9", rate=1000.0, burst=1000, retries=1, backoff=0.01)
+    client.session = RaisingSession(error, error)
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    assert client.session.calls == 2
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError("kesik"), RuntimeError("beklenmeyen")])
+def test_failed_half_open_trial_is_always_recorded(error):
+    client = ApiClient(
+        "trial", "http://127.0.0.1:9", rate=1000.0, burst=1000, retries=0,
+        failure_threshold=1, reset_timeout=0.1,
+    )
+    client.breaker.record_failure()
+    time.sleep(0.15)
+    client.session = RaisingSession(error)
+    with pytest.raises(Exception):
+        client.get_json("items")
+    # Deneme başarısız sayılır: devre yeniden açılır ve süre dolunca yeni
+    # bir denemeye izin verir
+    assert client.breaker.state == "open"
+    time.sleep(0.15)
+    assert client.breaker.allow()
+
+
+def test_breaker_opens_after_consecutive_failures(stub):
+    stub.queue("/items", *[(500, {}, {})] * 2)
+    client = make_client(stub, retries=0, failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            client.get_json("items")
+    assert client.breaker.state == "open"
+    # Devre açıkken istek sunucuya gitmeden düşer
+    with pytest.raises(CircuitOpenError):
+        client.get_json("items")
+    assert stub.hits["/items"] == 2
+
+
+def test_success_resets_failure_count(stub):
+    stub.queue("/items", (500, {}, {}), (200, {}, {}), (500, {}, {}))
+    client = make_client(stub, retries=0, failure_threshold=2)
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    client.get_json("items")
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_trial_success_closes_breaker(stub):
+    stub.queue("/items", (500, {}, {}))
+    client = make_client(stub, retries=0, failure_threshold=1, reset_timeout=0.2)
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    assert client.breaker.state == "open"
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    assert client.get_json("items") == {"ok": True}
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_trial_failure_reopens_breaker(stub):
+    stub.queue("/items", *[(500, {}, {})] * 3)
+    client = make_client(stub, retries=0, failure_threshold=3, reset_timeout=0.2)
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            client.get_json("items")
+    time.sleep(0.25)
+    # Yarı açık devrede tek deneme başarısız olursa devre yeniden açılır
+    stub.queue("/items", (503, {}, {}))
+    with pytest.raises(UpstreamError):
+        client.get_json("items")
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.get_json("items")
+
+
+def test_half_open_allows_a_single_trial():
+    client = ApiClient("trial", "http://127.0.0.1:9", rate=1000.0, burst=1000, failure_threshold=1, reset_timeout=0.0)
+    client.breaker.record_failure()
+    assert client.breaker.allow()
+    # İlk deneme sürerken ikinci istek geçmez
+    assert not client.breaker.allow()
+
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    bucket = TokenBucket(rate=20.0, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+    for _ in range(4):
+        bucket.acquire()
+    # Kova boşaldıktan sonra 4 jeton saniyede 20 hızla ~0,2 sn sürer
+    assert time.monotonic() - started >= 0.18
+
+
+def test_client_requests_are_rate_limited(stub):
+    client = make_client(stub, rate=10.0, burst=1)
+    started = time.monotonic()
+    for _ in range(3):
+        client.get_json("items")
+    assert time.monotonic() - started >= 0.18
+    assert stub.hits["/items"] == 3
+
+
+def test_try_acquire_keeps_reserve():
+    bucket = TokenBucket(rate=0.001, capacity=5)
+    assert bucket.try_acquire(reserve=3)
+    assert bucket.try_acquire(reserve=3)
+    # Üçüncü jeton alınsa kovada 3'ten az kalırdı
+    assert not bucket.try_acquire(reserve=3)
+    assert bucket.try_acquire()
+
+
+def test_background_requests_leave_reserve_for_foreground(stub):
+    client = make_client(stub, rate=0.001, burst=4)
+    with background_requests(0.5):
+        client.get_json("items")
+        client.get_json("items")
+        with pytest.raises(DeferredError):
+            client.get_json("items")
+    assert stub.hits["/items"] == 2
+    assert client.breaker.state == "closed"
+    # Kullanıcı isteği ayrılan payı kullanır ve beklemez
+    started = time.monotonic()
+    client.get_json("items")
+    client.get_json("items")
+    assert time.monotonic() - started < 0.5
+    assert stub.hits["/items"] == 4
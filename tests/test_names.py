@@ -0,0 +1,43 @@
+"""``names`` ayrıştırıcısının kanonik ad testleri."""
+import doctest
+
+import pytest
+
+import names
+from names import _parse_name, canonical_name, canonical_names, register, scientific_names
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Acalypha australis L.", "Acalypha australis"),
+    ("Alepes djedaba (Forsskål, 1775)", "Alepes djedaba"),
+    ("Sicyos angulatusL.", "Sicyos angulatus"),
+    ("Oenothera biennis var. parviflora", "Oenothera biennis parviflora"),
+    ("Acalypha australis f. glareosa (Rupr.) H.Hara", "Acalypha australis glareosa"),
+    ("Xanthium strumarium L. subsp. italicum", "Xanthium strumarium italicum"),
+    ("Xanthium strumarium L. subsp. italicum (Moretti) D.Löve", "Xanthium strumarium italicum"),
+    ("Aster squamatus (Spreng.) Hieron. var. graminifolius", "Aster squamatus graminifolius"),
+    ("Rattus rattus (Linnaeus, 1758) subsp. alexandrinus", "Rattus rattus alexandrinus"),
+    ("Thunbergia alata Bojer ex Sims", "Thunbergia alata"),
+    ("Ambrosia sp.", "Ambrosia"),
+])
+def test_canonical_name(raw, expected):
+    assert canonical_name(raw) == expected
+
+
+def test_authority_does_not_swallow_next_name():
+    text = "Acalypha australis L., Acalypha virginica var. rhomboidea"
+    assert scientific_names(text) == ["Acalypha australis", "Acalypha virginica rhomboidea"]
+
+
+def test_doctests():
+    assert doctest.testmod(names).failed == 0
+
+
+def test_registered_names_survive_lru_eviction(monkeypatch):
+    monkeypatch.setattr(names, "_registry", {})
+    raw = "Acalypha australis L."
+    register(dict(zip([raw], canonical_names([raw]))))
+    _parse_name.cache_clear()
+    assert canonical_name(raw) == "Acalypha australis"
+    # Kayıtlı ad ayrıştırıcıya (ve LRU önbelleğine) hiç uğramaz
+    assert _parse_name.cache_info().misses == 0